@@ -4,9 +4,43 @@ Temporarily Enable Public Access for Aurora PostgreSQL
 This will allow direct connection from your local machine
 """
 
+import time
 import boto3
 from botocore.exceptions import ClientError
 
+CLUSTER_IDENTIFIER = 'my-aurora-serverless'
+
+def wait_for_modification_start(rds, delay=5, max_attempts=24):
+    """Wait until a requested change has been picked up by the cluster"""
+    # Right after modify_db_cluster the cluster still reports 'available', so the
+    # availability waiter alone could return before the change is applied
+    for _ in range(max_attempts):
+        cluster = rds.describe_db_clusters(DBClusterIdentifier=CLUSTER_IDENTIFIER)['DBClusters'][0]
+        if cluster['Status'] != 'available' or not cluster.get('PendingModifiedValues'):
+            return
+        time.sleep(delay)
+    raise TimeoutError(
+        f"Cluster {CLUSTER_IDENTIFIER} still has pending modifications after {delay * max_attempts}s"
+    )
+
+def modify_cluster(**changes):
+    """Apply a group of cluster modifications in one call and wait until the cluster is available"""
+    rds = boto3.client('rds', region_name='us-west-2')
+    changes.setdefault('ApplyImmediately', True)
+    
+    # Grouping changes lets Aurora apply them in a single modification cycle
+    response = rds.modify_db_cluster(DBClusterIdentifier=CLUSTER_IDENTIFIER, **changes)
+    print(f"   Status: {response['DBCluster']['Status']}")
+    
+    print("⏳ Waiting for cluster to become available...")
+    wait_for_modification_start(rds)
+    waiter = rds.get_waiter('db_cluster_available')
+    waiter.wait(
+        DBClusterIdentifier=CLUSTER_IDENTIFIER,
+        WaiterConfig={'Delay': 15, 'MaxAttempts': 60}
+    )
+    return response
+
 def enable_aurora_public_access():
     """Enable public access for Aurora cluster"""
     
@@ -14,8 +48,6 @@ def enable_aurora_public_access():
     print("=" * 50)
     
     try:
-        rds = boto3.client('rds', region_name='us-west-2')
-        
         print("⚠️  WARNING: This will temporarily make your Aurora cluster publicly accessible!")
         print("   Make sure to disable it after database setup is complete.")
         
@@ -28,15 +60,10 @@ def enable_aurora_public_access():
         print("\n🔄 Modifying Aurora cluster to enable public access...")
         
         # Modify the cluster to enable public access
-        rds.modify_db_cluster(
-            DBClusterIdentifier='my-aurora-serverless',
-            PubliclyAccessible=True,
-            ApplyImmediately=True
-        )
+        modify_cluster(PubliclyAccessible=True)
         
-        print("✅ Aurora cluster modification initiated!")
-        print("⏳ This may take 5-10 minutes to complete.")
-        print("\n🔥 Once modification is complete, you can connect directly:")
+        print("✅ Aurora cluster is available with public access!")
+        print("\n🔥 You can now connect directly:")
         print("   python aurora_cmd_direct.py")
         
         return True
@@ -52,16 +79,10 @@ def disable_aurora_public_access():
     print("=" * 50)
     
     try:
-        rds = boto3.client('rds', region_name='us-west-2')
-        
         print("🔄 Modifying Aurora cluster to disable public access...")
         
         # Modify the cluster to disable public access
-        rds.modify_db_cluster(
-            DBClusterIdentifier='my-aurora-serverless',
-            PubliclyAccessible=False,
-            ApplyImmediately=True
-        )
+        modify_cluster(PubliclyAccessible=False)
         
         print("✅ Aurora cluster public access disabled!")
         print("🔒 Your database is now secure in private subnets only.")
@@ -91,7 +112,7 @@ def main():
         # Check current status
         try:
             rds = boto3.client('rds', region_name='us-west-2')
-            clusters = rds.describe_db_clusters(DBClusterIdentifier='my-aurora-serverless')
+            clusters = rds.describe_db_clusters(DBClusterIdentifier=CLUSTER_IDENTIFIER)
             cluster = clusters['DBClusters'][0]
             
             public_access = cluster.get('PubliclyAccessible', False)
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Shared botocore client configuration for the setup and test scripts
+"""
+
+from botocore.config import Config
+
+# Keep connections warm between calls and let botocore handle throttling retries.
+# The pool is sized for the largest thread pool in these scripts (8 workers) with
+# headroom, so concurrent calls never wait for a free connection
+BOTO_CONFIG = Config(
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': 5},
+    max_pool_connections=16
+)
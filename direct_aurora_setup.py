@@ -6,6 +6,8 @@ This bypasses RDS Data API permission issues by using direct psycopg2 connection
 
 import sys
 import json
+import boto3
+from botocore.exceptions import BotoCoreError, ClientError
 
 # Check if psycopg2 is available
 try:
@@ -18,30 +20,122 @@ except ImportError:
     print("❌ psycopg2 not available")
     print("   Install with: pip install psycopg2-binary")
 
-def get_connection_params():
-    """Get connection parameters for Aurora PostgreSQL"""
+# Aurora cluster endpoint and master login
+DB_HOST = 'my-aurora-serverless.cluster-cu2bffdza994.us-west-2.rds.amazonaws.com'
+DB_PORT = 5432
+DB_NAME = 'myapp'
+DB_USER = 'dbadmin'
+
+# Login role for IAM database authentication; the master user cannot hold rds_iam
+# alongside its password, so a dedicated role is created on the first run
+DB_IAM_USER = 'dbadmin_iam'
+
+# Master credentials secret, used until DB_IAM_USER exists
+DB_SECRET_ARN = "arn:aws:secretsmanager:us-west-2:133720367604:secret:my-aurora-serverless-1NyjuJ"
+
+# Session settings for the HNSW build, sized for a 1 ACU (~2 GiB) Serverless v2 instance;
+# cluster-wide parameters live in the Terraform parameter group (modules/database)
+INDEX_BUILD_SETTINGS = (
+    "SET maintenance_work_mem = '256MB';",
+    "SET max_parallel_maintenance_workers = 1;",
+)
+
+BAR50 = "=" * 50
+BAR60 = "=" * 60
+BAR65 = "=" * 65
+DASH50 = "-" * 50
+DASH60 = "-" * 60
+DASH70 = "-" * 70
+
+# Section headers, built once
+TITLE_HEADER = "🔧 Aurora PostgreSQL Vector Database Setup & Verification\n" + BAR65
+SETUP_HEADER = "\n" + BAR65 + "\n🔧 Setting up vector database...\n" + BAR65
+VERIFY_HEADER = "\n" + BAR65 + "\n🔍 Verifying database setup...\n" + BAR65
+QUERY_1_HEADER = "\n" + BAR60 + "\n📊 QUERY 1: SELECT * FROM pg_extension;\n" + BAR60
+QUERY_2_HEADER = "\n" + BAR60 + "\n📊 QUERY 2: Check bedrock_integration schema tables\n" + BAR60
+QUERY_3_HEADER = "\n" + BAR60 + "\n📊 QUERY 3: Check bedrock_kb table structure\n" + BAR60
+QUERY_4_HEADER = "\n" + BAR60 + "\n📊 QUERY 4: Check indexes on bedrock_kb table\n" + BAR60
+
+# Row formatter for the pg_extension listing, built once
+EXT_TMPL = "{:<20} {:<15} {:<10} {}".format
+
+def _base_connection_params(user):
+    """Connection parameters shared by both authentication methods"""
     return {
-        'host': 'my-aurora-serverless.cluster-cu2bffdza994.us-west-2.rds.amazonaws.com',
-        'port': 5432,
-        'database': 'myapp',
-        'user': 'dbadmin',
-        'password': '%252m!KjPM$(5[LX'  # Retrieved from Secrets Manager
+        'host': DB_HOST,
+        'port': DB_PORT,
+        'database': DB_NAME,
+        'user': user,
+        'sslmode': 'require',  # IAM authentication requires SSL
+        'connect_timeout': 5,
+        # Keep idle connections alive through NAT idle timeouts
+        'keepalives': 1,
+        'keepalives_idle': 30,
+        'keepalives_interval': 10,
+        'keepalives_count': 3
     }
 
+def get_connection_params():
+    """Get connection parameters for Aurora PostgreSQL using an IAM auth token"""
+    # The token is signed locally from the caller's AWS credentials (valid 15 minutes),
+    # so no Secrets Manager round-trip is needed
+    rds = boto3.client('rds', region_name='us-west-2')
+    token = rds.generate_db_auth_token(
+        DBHostname=DB_HOST,
+        Port=DB_PORT,
+        DBUsername=DB_IAM_USER,
+        Region='us-west-2'
+    )
+    return {**_base_connection_params(DB_IAM_USER), 'password': token}
+
+def get_secret_connection_params():
+    """Get connection parameters using the master password from AWS Secrets Manager"""
+    secretsmanager = boto3.client('secretsmanager', region_name='us-west-2')
+    response = secretsmanager.get_secret_value(SecretId=DB_SECRET_ARN)
+    secret_data = json.loads(response['SecretString'])
+    return {**_base_connection_params(DB_USER), 'password': secret_data['password']}
+
+def create_iam_login(conn):
+    """Create DB_IAM_USER with rds_iam and the master user's privileges"""
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = '{DB_IAM_USER}') THEN
+                CREATE ROLE {DB_IAM_USER} LOGIN;
+            END IF;
+        END
+        $$;
+    """)
+    cursor.execute(f"GRANT rds_iam, {DB_USER} TO {DB_IAM_USER};")
+    conn.commit()
+    cursor.close()
+    print(f"✅ IAM login role {DB_IAM_USER} ready for the next run")
+
+def connect_to_database():
+    """Connect with an IAM auth token, bootstrapping the IAM login role with the master password"""
+    try:
+        return psycopg2.connect(**get_connection_params())
+    except (BotoCoreError, ClientError, psycopg2.OperationalError) as e:
+        # Only expected on the first run, before DB_IAM_USER exists
+        print(f"⚠️ IAM authentication failed, using Secrets Manager password: {e}")
+    conn = psycopg2.connect(**get_secret_connection_params())
+    create_iam_login(conn)
+    return conn
+
 def test_basic_connection():
-    """Test basic connection to Aurora PostgreSQL"""
+    """Test basic connection to Aurora PostgreSQL, returning the open connection on success"""
     if not PSYCOPG2_AVAILABLE:
-        return False
-    
-    conn_params = get_connection_params()
+        return None
     
     try:
         print("🔄 Testing basic connection to Aurora PostgreSQL...")
-        print(f"   Host: {conn_params['host']}")
-        print(f"   Database: {conn_params['database']}")
-        print(f"   User: {conn_params['user']}")
+        print(f"   Host: {DB_HOST}")
+        print(f"   Database: {DB_NAME}")
+        print(f"   User: {DB_IAM_USER} (IAM) or {DB_USER}")
         
-        conn = psycopg2.connect(**conn_params)
+        conn = connect_to_database()
+        conn.autocommit = True  # Enable autocommit for extensions and schema creation
         cursor = conn.cursor()
         
         # Test basic query
@@ -51,24 +145,24 @@ def test_basic_connection():
         print(f"   Database version: {version}")
         
         cursor.close()
-        conn.close()
-        return True
+        return conn
         
     except Exception as e:
         print(f"❌ Connection failed: {e}")
-        return False
+        return None
 
-def setup_vector_database():
+def setup_vector_database(conn=None):
     """Set up vector database with all required components"""
     if not PSYCOPG2_AVAILABLE:
         print("❌ Cannot setup database without psycopg2")
         return False
     
-    conn_params = get_connection_params()
+    owns_conn = conn is None
     
     try:
         print("🔄 Setting up vector database...")
-        conn = psycopg2.connect(**conn_params)
+        if owns_conn:
+            conn = connect_to_database()
         conn.autocommit = True  # Enable autocommit for extensions and schema creation
         cursor = conn.cursor()
         
@@ -89,16 +183,12 @@ def setup_vector_database():
         
         print("\n3️⃣ Creating bedrock_user role...")
         try:
-            cursor.execute("""
-                DO $$ 
-                BEGIN 
-                    CREATE ROLE bedrock_user LOGIN PASSWORD 'BedrockUser2024!'; 
-                EXCEPTION 
-                    WHEN duplicate_object THEN 
-                        RAISE NOTICE 'Role bedrock_user already exists'; 
-                END $$;
-            """)
-            print("✅ bedrock_user role created/verified!")
+            cursor.execute("SELECT 1 FROM pg_roles WHERE rolname = 'bedrock_user';")
+            if cursor.fetchone():
+                print("✅ bedrock_user role already exists!")
+            else:
+                cursor.execute("CREATE ROLE bedrock_user LOGIN PASSWORD %s;", ('BedrockUser2024!',))
+                print("✅ bedrock_user role created!")
         except Exception as e:
             print(f"⚠️ Role creation error: {e}")
         
@@ -126,12 +216,10 @@ def setup_vector_database():
         
         print("\n6️⃣ Creating HNSW index for embeddings...")
         try:
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS bedrock_kb_embedding_idx 
-                ON bedrock_integration.bedrock_kb 
-                USING hnsw (embedding vector_cosine_ops);
-            """)
-            print("✅ HNSW index created!")
+            if create_hnsw_index(cursor):
+                print("✅ HNSW index created!")
+            else:
+                print("⚠️ HNSW index is still invalid after rebuild")
         except Exception as e:
             print(f"⚠️ Index creation error: {e}")
             print("   Vector extension might not be fully installed")
@@ -144,7 +232,9 @@ def setup_vector_database():
             print(f"⚠️ Table permission error: {e}")
         
         cursor.close()
-        conn.close()
+        if owns_conn:
+            conn.close()
+        
         print("\n🎉 Vector database setup completed!")
         return True
         
@@ -152,32 +242,89 @@ def setup_vector_database():
         print(f"❌ Database setup failed: {e}")
         return False
 
-def verify_database_setup():
+def create_hnsw_index(cursor, retries=1):
+    """Build the HNSW index concurrently, dropping and rebuilding any invalid leftover"""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, so the connection
+    # must be in autocommit mode
+    for setting in INDEX_BUILD_SETTINGS:
+        cursor.execute(setting)
+    try:
+        return _build_hnsw_index(cursor, retries)
+    finally:
+        cursor.execute("RESET maintenance_work_mem; RESET max_parallel_maintenance_workers;")
+
+def _build_hnsw_index(cursor, retries):
+    """Run the concurrent build, retrying once if it leaves an invalid index behind"""
+    for attempt in range(retries + 1):
+        error = None
+        try:
+            cursor.execute("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS bedrock_kb_embedding_idx 
+                ON bedrock_integration.bedrock_kb 
+                USING hnsw (embedding vector_cosine_ops) 
+                WITH (m = 24, ef_construction = 128);
+            """)
+        except psycopg2.Error as e:
+            error = e
+        
+        # A failed concurrent build leaves an INVALID index that IF NOT EXISTS would skip
+        cursor.execute("""
+            SELECT i.indisvalid 
+            FROM pg_index i 
+            JOIN pg_class c ON c.oid = i.indexrelid 
+            JOIN pg_namespace n ON n.oid = c.relnamespace 
+            WHERE n.nspname = 'bedrock_integration' 
+            AND c.relname = 'bedrock_kb_embedding_idx';
+        """)
+        row = cursor.fetchone()
+        if row and row[0]:
+            return True
+        
+        # Only an invalid leftover is worth rebuilding; with no index row the build
+        # failed outright and a retry would fail the same way
+        if row is None or attempt == retries:
+            if error:
+                raise error
+            return False
+        
+        if error:
+            print(f"⚠️ Concurrent index build failed: {error}")
+        print("🔄 Dropping invalid index and retrying...")
+        cursor.execute("DROP INDEX CONCURRENTLY IF EXISTS bedrock_integration.bedrock_kb_embedding_idx;")
+    
+    return False
+
+def verify_database_setup(conn=None):
     """Verify database setup with the requested queries"""
     if not PSYCOPG2_AVAILABLE:
         print("❌ Cannot verify database without psycopg2")
         return False
     
-    conn_params = get_connection_params()
+    owns_conn = conn is None
     
     try:
         print("🔍 Verifying database setup...")
-        conn = psycopg2.connect(**conn_params)
+        if owns_conn:
+            conn = connect_to_database()
         cursor = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
         
-        print("\n" + "="*60)
-        print("📊 QUERY 1: SELECT * FROM pg_extension;")
-        print("="*60)
+        print(QUERY_1_HEADER)
         
         cursor.execute("SELECT * FROM pg_extension;")
         extensions = cursor.fetchall()
         
-        print(f"Found {len(extensions)} extensions:")
-        print(f"{'Extension Name':<20} {'Schema':<15} {'Version':<10} {'Relocatable'}")
-        print("-"*60)
+        print("\n".join([
+            f"Found {len(extensions)} extensions:",
+            EXT_TMPL('Extension Name', 'Schema', 'Version', 'Relocatable'),
+            DASH60,
+        ]))
         
-        for ext in extensions:
-            print(f"{ext['extname']:<20} {ext['extnamespace']:<15} {ext['extversion']:<10} {ext['extrelocatable']}")
+        buf = "\n".join(
+            EXT_TMPL(ext['extname'], ext['extnamespace'], ext['extversion'], ext['extrelocatable'])
+            for ext in extensions
+        )
+        if buf:
+            sys.stdout.write(buf + "\n")
         
         # Check specifically for vector extension
         vector_found = False
@@ -190,9 +337,7 @@ def verify_database_setup():
         if not vector_found:
             print("\n❌ Vector extension NOT found!")
         
-        print("\n" + "="*60)
-        print("📊 QUERY 2: Check bedrock_integration schema tables")
-        print("="*60)
+        print(QUERY_2_HEADER)
         
         cursor.execute("""
             SELECT 
@@ -209,17 +354,17 @@ def verify_database_setup():
         tables = cursor.fetchall()
         
         if tables:
-            print(f"Found {len(tables)} tables in bedrock_integration schema:")
-            print(f"{'Table Name':<35} {'Type'}")
-            print("-"*50)
+            print("\n".join([
+                f"Found {len(tables)} tables in bedrock_integration schema:",
+                f"{'Table Name':<35} {'Type'}",
+                DASH50,
+            ]))
             for table in tables:
                 print(f"{table['show_tables']:<35} {table['table_type']}")
         else:
             print("❌ No tables found in bedrock_integration schema!")
         
-        print("\n" + "="*60)
-        print("📊 QUERY 3: Check bedrock_kb table structure")
-        print("="*60)
+        print(QUERY_3_HEADER)
         
         cursor.execute("""
             SELECT 
@@ -240,9 +385,11 @@ def verify_database_setup():
         columns = cursor.fetchall()
         
         if columns:
-            print(f"bedrock_kb table structure:")
-            print(f"{'Column Name':<15} {'Data Type':<20} {'Nullable':<10} {'Default'}")
-            print("-"*70)
+            print("\n".join([
+                "bedrock_kb table structure:",
+                f"{'Column Name':<15} {'Data Type':<20} {'Nullable':<10} {'Default'}",
+                DASH70,
+            ]))
             for col in columns:
                 default = col['column_default'] or 'None'
                 if len(default) > 20:
@@ -251,9 +398,7 @@ def verify_database_setup():
         else:
             print("❌ bedrock_kb table not found!")
         
-        print("\n" + "="*60)
-        print("📊 QUERY 4: Check indexes on bedrock_kb table")
-        print("="*60)
+        print(QUERY_4_HEADER)
         
         cursor.execute("""
             SELECT 
@@ -270,21 +415,25 @@ def verify_database_setup():
         indexes = cursor.fetchall()
         
         if indexes:
-            print(f"Indexes on bedrock_kb table:")
+            lines = ["Indexes on bedrock_kb table:"]
             for idx in indexes:
-                print(f"  • {idx['indexname']}")
-                print(f"    Definition: {idx['indexdef']}")
+                lines.append(f"  • {idx['indexname']}")
+                lines.append(f"    Definition: {idx['indexdef']}")
+            print("\n".join(lines))
         else:
             print("❌ No indexes found on bedrock_kb table!")
         
         cursor.close()
-        conn.close()
+        if owns_conn:
+            conn.close()
         
-        print(f"\n🎯 Database Verification Summary:")
-        print(f"  • Vector extension: {'✅ Installed' if vector_found else '❌ Missing'}")
-        print(f"  • bedrock_integration schema: {'✅ Found' if tables else '❌ Missing'}")
-        print(f"  • bedrock_kb table: {'✅ Found' if columns else '❌ Missing'}")
-        print(f"  • Table indexes: {'✅ Found' if indexes else '❌ Missing'}")
+        print("\n".join([
+            "\n🎯 Database Verification Summary:",
+            f"  • Vector extension: {'✅ Installed' if vector_found else '❌ Missing'}",
+            f"  • bedrock_integration schema: {'✅ Found' if tables else '❌ Missing'}",
+            f"  • bedrock_kb table: {'✅ Found' if columns else '❌ Missing'}",
+            f"  • Table indexes: {'✅ Found' if indexes else '❌ Missing'}",
+        ]))
         
         return True
         
@@ -294,60 +443,56 @@ def verify_database_setup():
 
 def show_installation_instructions():
     """Show instructions for installing psycopg2 and PostgreSQL tools"""
-    print("\n🛠️ Installation Instructions:")
-    print("="*50)
-    
-    print("\n1️⃣ Install psycopg2 (Python PostgreSQL adapter):")
-    print("   pip install psycopg2-binary")
-    
-    print("\n2️⃣ Alternative: Install PostgreSQL client tools:")
-    print("   • Download from: https://www.postgresql.org/download/windows/")
-    print("   • Or use chocolatey: choco install postgresql")
-    print("   • Or use winget: winget install PostgreSQL.PostgreSQL")
-    
-    print("\n3️⃣ Use pgAdmin (GUI tool):")
-    print("   • Download from: https://www.pgadmin.org/download/")
-    print("   • Create server with connection details from above")
-    
-    print("\n4️⃣ Connect via command line (if psql installed):")
-    conn_params = get_connection_params()
-    print(f"   psql -h {conn_params['host']} \\")
-    print(f"        -p {conn_params['port']} \\")
-    print(f"        -U {conn_params['user']} \\")
-    print(f"        -d {conn_params['database']}")
-    print(f"   Password: {conn_params['password']}")
+    print("\n".join([
+        "\n🛠️ Installation Instructions:",
+        BAR50,
+        "\n1️⃣ Install psycopg2 (Python PostgreSQL adapter):",
+        "   pip install psycopg2-binary",
+        "\n2️⃣ Alternative: Install PostgreSQL client tools:",
+        "   • Download from: https://www.postgresql.org/download/windows/",
+        "   • Or use chocolatey: choco install postgresql",
+        "   • Or use winget: winget install PostgreSQL.PostgreSQL",
+        "\n3️⃣ Use pgAdmin (GUI tool):",
+        "   • Download from: https://www.pgadmin.org/download/",
+        "   • Create server with connection details from above",
+        "\n4️⃣ Connect via command line (if psql installed):",
+        f"   psql -h {DB_HOST} \\",
+        f"        -p {DB_PORT} \\",
+        f"        -U {DB_IAM_USER} \\",
+        f"        -d {DB_NAME}",
+        f"   Password: IAM auth token (aws rds generate-db-auth-token --username {DB_IAM_USER})",
+    ]))
 
 def main():
-    print("🔧 Aurora PostgreSQL Vector Database Setup & Verification")
-    print("="*65)
+    print(TITLE_HEADER)
     
     if not PSYCOPG2_AVAILABLE:
         show_installation_instructions()
         print(f"\n❌ Cannot proceed without psycopg2. Please install it first.")
         return
     
-    # Test basic connection
-    if not test_basic_connection():
+    # Test basic connection and reuse it for setup and verification
+    conn = test_basic_connection()
+    if conn is None:
         print(f"\n❌ Cannot connect to database. Please check connection details.")
         return
     
-    print(f"\n" + "="*65)
-    print("🔧 Setting up vector database...")
-    print("="*65)
+    print(SETUP_HEADER)
     
     # Setup vector database
-    setup_success = setup_vector_database()
+    setup_success = setup_vector_database(conn)
     
-    print(f"\n" + "="*65)
-    print("🔍 Verifying database setup...")
-    print("="*65)
+    print(VERIFY_HEADER)
     
     # Verify setup
-    verify_database_setup()
+    verify_database_setup(conn)
+    conn.close()
     
     if setup_success:
-        print(f"\n🎉 Database setup and verification completed!")
-        print(f"🔥 Ready to create Bedrock Knowledge Base with Aurora PostgreSQL!")
+        print("\n".join([
+            "\n🎉 Database setup and verification completed!",
+            "🔥 Ready to create Bedrock Knowledge Base with Aurora PostgreSQL!",
+        ]))
     else:
         print(f"\n⚠️ Database setup had some issues. Check the output above.")
 
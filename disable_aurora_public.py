@@ -3,29 +3,20 @@
 Disable Aurora PostgreSQL Public Access
 """
 
-import boto3
-from botocore.exceptions import ClientError
+from aurora_public_access import modify_cluster
 
-def disable_public_access():
-    """Disable public access for Aurora cluster"""
+def disable_public_access(**extra_changes):
+    """Disable public access for Aurora cluster, applying any extra cluster changes in the same call"""
     
     print("🔒 Disabling Public Access for Aurora PostgreSQL")
     print("=" * 50)
     
     try:
-        rds = boto3.client('rds', region_name='us-west-2')
-        
         print("🔄 Modifying Aurora cluster to disable public access...")
         
         # Modify the cluster to disable public access
-        response = rds.modify_db_cluster(
-            DBClusterIdentifier='my-aurora-serverless',
-            PubliclyAccessible=False,
-            ApplyImmediately=True
-        )
-        
+        modify_cluster(PubliclyAccessible=False, **extra_changes)
         print("✅ Aurora cluster public access disabled!")
-        print(f"   Status: {response['DBCluster']['Status']}")
         print("🔒 Your database is now secure in private subnets only.")
         
         return True
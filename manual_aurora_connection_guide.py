@@ -4,46 +4,67 @@ Manual Database Connection Guide for Aurora PostgreSQL
 Since direct Python connection has issues, let's provide manual connection methods
 """
 
+BAR50 = "=" * 50
+BAR70 = "=" * 70
+DASH40 = "-" * 40
+
+# Title and closing summary, built once
+TITLE_TEXT = "🚀 Aurora PostgreSQL Manual Connection & Verification Guide\n" + BAR70
+SUMMARY_TEXT = "\n".join([
+    "\n" + BAR70,
+    "🎯 SUMMARY: Next Steps",
+    BAR70,
+    "1. Choose your preferred connection method (RDS Query Editor recommended)",
+    "2. Connect to the Aurora PostgreSQL database",
+    "3. Run the verification queries and take screenshots",
+    "4. If database is not set up, run the setup queries",
+    "5. Share the screenshots for analysis",
+    "\n🔥 Once database is verified, we can create the Bedrock Knowledge Base!",
+])
+
 def show_connection_details():
     """Show all connection details for manual connection"""
-    print("🔧 Aurora PostgreSQL Connection Details")
-    print("="*50)
-    print("Host: my-aurora-serverless.cluster-cu2bffdza994.us-west-2.rds.amazonaws.com")
-    print("Port: 5432")
-    print("Database: myapp")
-    print("Username: dbadmin")
-    print("Password: %252m!KjPM$(5[LX")
-    print("Engine: PostgreSQL 15.4")
+    print("\n".join([
+        "🔧 Aurora PostgreSQL Connection Details",
+        BAR50,
+        "Host: my-aurora-serverless.cluster-cu2bffdza994.us-west-2.rds.amazonaws.com",
+        "Port: 5432",
+        "Database: myapp",
+        "Username: dbadmin",
+        "Password: %252m!KjPM$(5[LX",
+        "Engine: PostgreSQL 15.4",
+    ]))
 
 def show_rds_query_editor_method():
     """Show how to use RDS Query Editor with database credentials"""
-    print("\n🎯 Method 1: RDS Query Editor (Recommended)")
-    print("="*50)
-    print("1. Go to AWS RDS Console")
-    print("2. Find your Aurora cluster: my-aurora-serverless")
-    print("3. Click 'Query Editor'")
-    print("4. Instead of 'Connect using RDS Data API', choose:")
-    print("   → 'Add new database credentials'")
-    print("   → 'Connect using database credentials'")
-    print("5. Enter the connection details manually:")
-    print("   • Database username: dbadmin")
-    print("   • Database password: %252m!KjPM$(5[LX")
-    print("   • Database name: myapp")
-    print("6. Click 'Connect to database'")
+    print("\n".join([
+        "\n🎯 Method 1: RDS Query Editor (Recommended)",
+        BAR50,
+        "1. Go to AWS RDS Console",
+        "2. Find your Aurora cluster: my-aurora-serverless",
+        "3. Click 'Query Editor'",
+        "4. Instead of 'Connect using RDS Data API', choose:",
+        "   → 'Add new database credentials'",
+        "   → 'Connect using database credentials'",
+        "5. Enter the connection details manually:",
+        "   • Database username: dbadmin",
+        "   • Database password: %252m!KjPM$(5[LX",
+        "   • Database name: myapp",
+        "6. Click 'Connect to database'",
+    ]))
 
 def show_verification_queries():
     """Show the exact queries to run for verification"""
-    print("\n📊 Verification Queries to Run")
-    print("="*50)
-    
-    print("\n🔍 Query 1: Check installed extensions")
-    print("-"*40)
-    print("SELECT * FROM pg_extension;")
-    print("\n📸 Take a screenshot of this result!")
-    
-    print("\n🔍 Query 2: Check bedrock_integration schema tables")
-    print("-"*40)
-    print("""SELECT 
+    print("\n".join([
+        "\n📊 Verification Queries to Run",
+        BAR50,
+        "\n🔍 Query 1: Check installed extensions",
+        DASH40,
+        "SELECT * FROM pg_extension;",
+        "\n📸 Take a screenshot of this result!",
+        "\n🔍 Query 2: Check bedrock_integration schema tables",
+        DASH40,
+        """SELECT 
     table_schema || '.' || table_name as show_tables,
     table_type
 FROM 
@@ -51,12 +72,11 @@ FROM
 WHERE 
     table_type = 'BASE TABLE' 
 AND 
-    table_schema = 'bedrock_integration';""")
-    print("\n📸 Take a screenshot of this result!")
-    
-    print("\n🔍 Query 3: Check bedrock_kb table structure (if it exists)")
-    print("-"*40)
-    print("""SELECT 
+    table_schema = 'bedrock_integration';""",
+        "\n📸 Take a screenshot of this result!",
+        "\n🔍 Query 3: Check bedrock_kb table structure (if it exists)",
+        DASH40,
+        """SELECT 
     column_name,
     data_type,
     is_nullable,
@@ -68,19 +88,16 @@ WHERE
 AND 
     table_name = 'bedrock_kb'
 ORDER BY 
-    ordinal_position;""")
-    print("\n📸 Take a screenshot of this result!")
-    
-    print("\n🔍 Query 4: Check current database version")
-    print("-"*40)
-    print("SELECT version();")
-    print("\n📸 Take a screenshot of this result!")
+    ordinal_position;""",
+        "\n📸 Take a screenshot of this result!",
+        "\n🔍 Query 4: Check current database version",
+        DASH40,
+        "SELECT version();",
+        "\n📸 Take a screenshot of this result!",
+    ]))
 
 def show_setup_queries():
     """Show queries to set up the vector database if not already done"""
-    print("\n🛠️ Database Setup Queries (Run these if database is not set up)")
-    print("="*70)
-    
     queries = [
         ("1. Create vector extension", "CREATE EXTENSION IF NOT EXISTS vector;"),
         ("2. Create bedrock_integration schema", "CREATE SCHEMA IF NOT EXISTS bedrock_integration;"),
@@ -104,48 +121,53 @@ USING hnsw (embedding vector_cosine_ops);"""),
         ("7. Grant table permissions", "GRANT ALL ON TABLE bedrock_integration.bedrock_kb TO bedrock_user;")
     ]
     
+    lines = [
+        "\n🛠️ Database Setup Queries (Run these if database is not set up)",
+        BAR70,
+    ]
     for step, query in queries:
-        print(f"\n{step}:")
-        print("-" * len(step))
-        print(query)
-        print()
+        lines += [f"\n{step}:", "-" * len(step), query, ""]
+    print("\n".join(lines))
 
 def show_pgadmin_method():
     """Show how to use pgAdmin for connection"""
-    print("\n🎯 Method 2: pgAdmin (GUI Tool)")
-    print("="*50)
-    print("1. Download pgAdmin: https://www.pgadmin.org/download/")
-    print("2. Install and open pgAdmin")
-    print("3. Right-click 'Servers' → Create → Server")
-    print("4. Fill in the connection details:")
-    print("   • Name: Aurora Heavy Machinery DB")
-    print("   • Host: my-aurora-serverless.cluster-cu2bffdza994.us-west-2.rds.amazonaws.com")
-    print("   • Port: 5432")
-    print("   • Database: myapp")
-    print("   • Username: dbadmin")
-    print("   • Password: %252m!KjPM$(5[LX")
-    print("5. Click 'Save' to connect")
-    print("6. Run the verification queries in the Query Tool")
+    print("\n".join([
+        "\n🎯 Method 2: pgAdmin (GUI Tool)",
+        BAR50,
+        "1. Download pgAdmin: https://www.pgadmin.org/download/",
+        "2. Install and open pgAdmin",
+        "3. Right-click 'Servers' → Create → Server",
+        "4. Fill in the connection details:",
+        "   • Name: Aurora Heavy Machinery DB",
+        "   • Host: my-aurora-serverless.cluster-cu2bffdza994.us-west-2.rds.amazonaws.com",
+        "   • Port: 5432",
+        "   • Database: myapp",
+        "   • Username: dbadmin",
+        "   • Password: %252m!KjPM$(5[LX",
+        "5. Click 'Save' to connect",
+        "6. Run the verification queries in the Query Tool",
+    ]))
 
 def show_psql_method():
     """Show command line connection method"""
-    print("\n🎯 Method 3: Command Line (psql)")
-    print("="*50)
-    print("1. Install PostgreSQL client tools:")
-    print("   • Download: https://www.postgresql.org/download/windows/")
-    print("   • Or use: winget install PostgreSQL.PostgreSQL")
-    print("   • Add to PATH: C:\\Program Files\\PostgreSQL\\16\\bin")
-    print("\n2. Connect using psql:")
-    print("psql -h my-aurora-serverless.cluster-cu2bffdza994.us-west-2.rds.amazonaws.com \\")
-    print("     -p 5432 \\")
-    print("     -U dbadmin \\")
-    print("     -d myapp")
-    print("\n3. Enter password when prompted: %252m!KjPM$(5[LX")
-    print("4. Run the verification queries")
+    print("\n".join([
+        "\n🎯 Method 3: Command Line (psql)",
+        BAR50,
+        "1. Install PostgreSQL client tools:",
+        "   • Download: https://www.postgresql.org/download/windows/",
+        "   • Or use: winget install PostgreSQL.PostgreSQL",
+        "   • Add to PATH: C:\\Program Files\\PostgreSQL\\16\\bin",
+        "\n2. Connect using psql:",
+        "psql -h my-aurora-serverless.cluster-cu2bffdza994.us-west-2.rds.amazonaws.com \\",
+        "     -p 5432 \\",
+        "     -U dbadmin \\",
+        "     -d myapp",
+        "\n3. Enter password when prompted: %252m!KjPM$(5[LX",
+        "4. Run the verification queries",
+    ]))
 
 def main():
-    print("🚀 Aurora PostgreSQL Manual Connection & Verification Guide")
-    print("="*70)
+    print(TITLE_TEXT)
     
     show_connection_details()
     show_rds_query_editor_method()
@@ -154,15 +176,7 @@ def main():
     show_pgadmin_method()
     show_psql_method()
     
-    print("\n" + "="*70)
-    print("🎯 SUMMARY: Next Steps")
-    print("="*70)
-    print("1. Choose your preferred connection method (RDS Query Editor recommended)")
-    print("2. Connect to the Aurora PostgreSQL database")
-    print("3. Run the verification queries and take screenshots")
-    print("4. If database is not set up, run the setup queries")
-    print("5. Share the screenshots for analysis")
-    print("\n🔥 Once database is verified, we can create the Bedrock Knowledge Base!")
+    print(SUMMARY_TEXT)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -7,11 +7,14 @@ resource "aws_rds_cluster" "aurora_serverless" {
   master_username         = var.master_username
   master_password         = random_password.master_password.result
   enable_http_endpoint    = true
+  iam_database_authentication_enabled = true
   skip_final_snapshot     = true
   apply_immediately       = true
 
   allow_major_version_upgrade = true
 
+  db_cluster_parameter_group_name = aws_rds_cluster_parameter_group.aurora.name
+
   serverlessv2_scaling_configuration {
     max_capacity             = var.max_capacity
     min_capacity             = var.min_capacity
@@ -21,6 +24,20 @@ resource "aws_rds_cluster" "aurora_serverless" {
   db_subnet_group_name   = aws_db_subnet_group.aurora.name
 }
 
+# Custom cluster parameter group (the default group cannot be modified)
+resource "aws_rds_cluster_parameter_group" "aurora" {
+  name   = "${var.cluster_identifier}-pg"
+  family = "aurora-postgresql${split(".", var.engine_version)[0]}"
+
+  # Memory-heavy maintenance settings are set per session by direct_aurora_setup.py,
+  # since a 1 ACU instance only has about 2 GiB of RAM
+  parameter {
+    name         = "effective_io_concurrency"
+    value        = "256"
+    apply_method = "immediate"
+  }
+}
+
 resource "aws_rds_cluster_instance" "aurora_instance" {
   cluster_identifier = aws_rds_cluster.aurora_serverless.id
   instance_class     = "db.serverless"
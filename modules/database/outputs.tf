@@ -23,6 +23,11 @@ output "database_name" {
   value = aws_rds_cluster.aurora_serverless.database_name
 }
 
+output "cluster_parameter_group_name" {
+  description = "Cluster parameter group name"
+  value = aws_rds_cluster_parameter_group.aurora.name
+}
+
 output "database_arn" {
   description = "Database arn"
   value = aws_rds_cluster.aurora_serverless.arn
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Orchestrate Aurora Vector Database Setup
+Enables public access, runs the direct setup and verification, then disables public access
+"""
+
+from enable_aurora_public import enable_public_access
+from disable_aurora_public import disable_public_access
+import direct_aurora_setup
+
+def main():
+    print("🚀 Aurora PostgreSQL Setup Orchestration")
+    print("=" * 50)
+
+    try:
+        # The tuned parameter group is attached by Terraform, so only public access changes here.
+        # Enabling can fail after the modification was accepted (e.g. waiter timeout), so it
+        # sits inside the try to make sure access is always disabled again
+        if not enable_public_access():
+            print("\n❌ Could not enable public access. Aborting.")
+            return
+
+        direct_aurora_setup.main()
+    finally:
+        # Always lock the cluster down again, even if setup failed
+        print()
+        disable_public_access()
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,56 @@ Enhanced Database Setup with Better Error Handling and Output Display
 """
 import boto3
 import json
-import time
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from botocore.exceptions import ClientError
+from boto_config import BOTO_CONFIG
 
-def execute_sql_with_data_api(sql_statement, cluster_arn, secret_arn):
+# Setup DDL grouped into dependency waves; statements within a wave are independent.
+# Each statement is paired with the EXISTENCE_PROBE column that makes it redundant (None = always run).
+SETUP_WAVES = [
+    [
+        ('ext_vector', "CREATE EXTENSION IF NOT EXISTS vector;"),
+        ('kb_schema', "CREATE SCHEMA IF NOT EXISTS bedrock_integration;"),
+        ('kb_role', "DO $$ BEGIN CREATE ROLE bedrock_user LOGIN; EXCEPTION WHEN duplicate_object THEN RAISE NOTICE 'Role already exists'; END $$;"),
+    ],
+    [
+        (None, "GRANT ALL ON SCHEMA bedrock_integration TO bedrock_user;"),
+        (None, "ALTER ROLE bedrock_user PASSWORD 'BedrockUser2024!';"),
+        ('kb_table', """CREATE TABLE IF NOT EXISTS bedrock_integration.bedrock_kb (
+            id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+            embedding vector(1536),
+            chunks text,
+            metadata json
+        );"""),
+    ],
+    [
+        ('kb_index', "CREATE INDEX IF NOT EXISTS bedrock_kb_embedding_idx ON bedrock_integration.bedrock_kb USING hnsw (embedding vector_cosine_ops);"),
+        (None, "GRANT ALL ON TABLE bedrock_integration.bedrock_kb TO bedrock_user;"),
+    ],
+]
+
+# One round-trip that reports which setup objects already exist
+EXISTENCE_PROBE = """SELECT
+    EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'vector') AS ext_vector,
+    EXISTS (SELECT 1 FROM information_schema.schemata WHERE schema_name = 'bedrock_integration') AS kb_schema,
+    EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'bedrock_user') AS kb_role,
+    EXISTS (SELECT 1 FROM information_schema.tables WHERE table_schema = 'bedrock_integration' AND table_name = 'bedrock_kb') AS kb_table,
+    EXISTS (SELECT 1 FROM pg_indexes WHERE schemaname = 'bedrock_integration' AND indexname = 'bedrock_kb_embedding_idx') AS kb_index;"""
+
+logger = logging.getLogger(__name__)
+
+# Clients are created once from a shared session and shared across threads (boto3 clients
+# are thread-safe), so parallel statements reuse the same pool of keep-alive connections
+SESSION = boto3.session.Session(region_name='us-west-2')
+RDS_DATA = SESSION.client('rds-data', config=BOTO_CONFIG)
+RDS = SESSION.client('rds', config=BOTO_CONFIG)
+
+def execute_sql_with_data_api(rds_client, sql_statement, cluster_arn, secret_arn, row_level=logging.DEBUG):
     """Execute SQL using RDS Data API with detailed output"""
     try:
-        rds_client = boto3.client('rds-data', region_name='us-west-2')
-        
-        print(f"🔄 Executing: {sql_statement}")
+        logger.info("🔄 Executing: %s", sql_statement)
         
         response = rds_client.execute_statement(
             resourceArn=cluster_arn,
@@ -22,36 +63,92 @@ def execute_sql_with_data_api(sql_statement, cluster_arn, secret_arn):
             includeResultMetadata=True
         )
         
-        print(f"✅ Success!")
+        logger.info("✅ Success!")
         
-        # Display results if any
-        if 'records' in response and response['records']:
-            print(f"📊 Results:")
-            records = response['records']
-            for i, record in enumerate(records):
-                print(f"   Row {i+1}: {record}")
+        # Per-row output defaults to debug level; skip building it entirely when that level is off
+        if response.get('records') and logger.isEnabledFor(row_level):
+            logger.log(row_level, "📊 Results:\n%s", "\n".join(
+                f"   Row {i+1}: {record}" for i, record in enumerate(response['records'])
+            ))
         
         if 'numberOfRecordsUpdated' in response:
-            print(f"📈 Records affected: {response['numberOfRecordsUpdated']}")
+            logger.info("📈 Records affected: %s", response['numberOfRecordsUpdated'])
             
         return True, response
         
     except ClientError as e:
         error_code = e.response['Error']['Code']
         error_message = e.response['Error']['Message']
-        print(f"❌ Error ({error_code}): {error_message}")
+        logger.error("❌ Error (%s): %s", error_code, error_message)
         return False, str(e)
 
+def probe_existing_objects(cluster_arn, secret_arn):
+    """Return a dict of setup object name -> exists, or an empty dict if the probe fails"""
+    try:
+        response = RDS_DATA.execute_statement(
+            resourceArn=cluster_arn,
+            secretArn=secret_arn,
+            database='myapp',
+            sql=EXISTENCE_PROBE,
+            includeResultMetadata=True
+        )
+    except ClientError as e:
+        logger.error("❌ Existence probe failed, running full setup: %s", e)
+        return {}
+    
+    names = [column['name'] for column in response['columnMetadata']]
+    values = [field.get('booleanValue', False) for field in response['records'][0]]
+    return dict(zip(names, values))
+
+def filter_setup_waves(waves, existing):
+    """Drop statements whose objects already exist; grants only run when something is created"""
+    missing = [
+        [(key, sql) for key, sql in wave if key is None or not existing.get(key)]
+        for wave in waves
+    ]
+    
+    if not any(key for wave in missing for key, _ in wave):
+        # Every object already exists, so the grants were applied on a previous run
+        return []
+    
+    return [[sql for _, sql in wave] for wave in missing if wave]
+
+def build_setup_script(commands):
+    """Combine setup statements into a single anonymous PL/pgSQL block"""
+    body = []
+    for cmd in commands:
+        if cmd.startswith("DO $$ "):
+            # A nested DO block becomes an inner BEGIN ... END sub-block
+            cmd = cmd[len("DO $$ "):-len(" $$;")] + ";"
+        body.append(cmd)
+    return "DO $$ BEGIN\n" + "\n".join(body) + "\nEND $$;"
+
+def execute_setup_waves(waves, cluster_arn, secret_arn):
+    """Execute setup waves one statement per call, returning the number of successful statements"""
+    success_count = 0
+    
+    # Execute each dependency wave concurrently, waiting for a wave to finish before the next
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for i, wave in enumerate(waves, 1):
+            print(f"\n[Wave {i}/{len(waves)}] {len(wave)} commands")
+            results = executor.map(
+                lambda cmd: execute_sql_with_data_api(RDS_DATA, cmd, cluster_arn, secret_arn),
+                wave
+            )
+            success_count += sum(1 for success, _ in results if success)
+    
+    return success_count
+
 def try_alternative_connection():
     """Try alternative connection methods"""
     print("\n🔄 Trying alternative approaches...")
     
     # Check if we can at least verify the cluster exists
     try:
-        rds = boto3.client('rds', region_name='us-west-2')
-        clusters = rds.describe_db_clusters()
+        # Ask for the target cluster only instead of listing every cluster in the account
+        clusters = RDS.describe_db_clusters(DBClusterIdentifier='my-aurora-serverless')
         
-        aurora_clusters = [c for c in clusters['DBClusters'] if 'aurora' in c['DBClusterIdentifier']]
+        aurora_clusters = clusters['DBClusters']
         
         if aurora_clusters:
             print("✅ Found Aurora clusters:")
@@ -65,79 +162,84 @@ def try_alternative_connection():
         else:
             print("❌ No Aurora clusters found")
             
+    except RDS.exceptions.DBClusterNotFoundFault:
+        print("❌ No Aurora clusters found")
     except ClientError as e:
         print(f"❌ Cannot access RDS service: {e}")
 
+# Manual setup and verification SQL shown by show_manual_execution_steps, formatted once
+_MANUAL_COMMANDS = (
+    "-- Step 1: Enable vector extension",
+    "CREATE EXTENSION IF NOT EXISTS vector;",
+    "",
+    "-- Step 2: Create schema",
+    "CREATE SCHEMA IF NOT EXISTS bedrock_integration;",
+    "",
+    "-- Step 3: Create user",
+    "DO $$ BEGIN CREATE ROLE bedrock_user LOGIN; EXCEPTION WHEN duplicate_object THEN RAISE NOTICE 'Role exists'; END $$;",
+    "",
+    "-- Step 4: Set permissions",
+    "GRANT ALL ON SCHEMA bedrock_integration TO bedrock_user;",
+    "ALTER ROLE bedrock_user PASSWORD 'BedrockUser2024!';",
+    "",
+    "-- Step 5: Create vector table",
+    "CREATE TABLE IF NOT EXISTS bedrock_integration.bedrock_kb (",
+    "    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),",
+    "    embedding vector(1536),",
+    "    chunks text,",
+    "    metadata json",
+    ");",
+    "",
+    "-- Step 6: Create indexes",
+    "CREATE INDEX IF NOT EXISTS bedrock_kb_embedding_idx ON bedrock_integration.bedrock_kb USING hnsw (embedding vector_cosine_ops);",
+    "GRANT ALL ON TABLE bedrock_integration.bedrock_kb TO bedrock_user;",
+)
+_MANUAL_STEPS_TEXT = "\n".join(f"   {cmd}" for cmd in _MANUAL_COMMANDS) + "\n"
+
+_VERIFICATION_QUERIES = (
+    "-- Check if vector extension is installed",
+    "SELECT * FROM pg_extension WHERE extname = 'vector';",
+    "",
+    "-- Check bedrock_integration tables",
+    "SELECT table_schema || '.' || table_name as show_tables",
+    "FROM information_schema.tables",
+    "WHERE table_type = 'BASE TABLE' AND table_schema = 'bedrock_integration';",
+    "",
+    "-- Check all extensions",
+    "SELECT * FROM pg_extension;",
+    "",
+    "-- Check database version",
+    "SELECT version();",
+)
+_VERIFICATION_TEXT = "\n".join(f"   {query}" for query in _VERIFICATION_QUERIES) + "\n"
+
+_MANUAL_EXECUTION_TEXT = (
+    "\n" + "=" * 80 + "\n"
+    "📋 MANUAL DATABASE SETUP STEPS\n"
+    + "=" * 80 + "\n"
+    "\n1️⃣ **Access AWS RDS Query Editor:**\n"
+    "   • Open AWS Console: https://console.aws.amazon.com/rds/\n"
+    "   • Navigate to: Databases > my-aurora-serverless\n"
+    "   • Click: 'Query Editor' tab\n"
+    "   • Connect using database credentials\n"
+    "\n2️⃣ **Run Setup Commands (Copy & Paste):**\n"
+    + _MANUAL_STEPS_TEXT +
+    "\n3️⃣ **Verification Queries:**\n"
+    + _VERIFICATION_TEXT +
+    "\n4️⃣ **Expected Results:**\n"
+    "   • Vector extension should be listed in pg_extension\n"
+    "   • bedrock_integration.bedrock_kb table should exist\n"
+    "   • No errors during table/index creation\n"
+)
+
 def show_manual_execution_steps():
     """Show step-by-step manual execution"""
-    print("\n" + "="*80)
-    print("📋 MANUAL DATABASE SETUP STEPS")
-    print("="*80)
-    
-    print("\n1️⃣ **Access AWS RDS Query Editor:**")
-    print("   • Open AWS Console: https://console.aws.amazon.com/rds/")
-    print("   • Navigate to: Databases > my-aurora-serverless")
-    print("   • Click: 'Query Editor' tab")
-    print("   • Connect using database credentials")
-    
-    print("\n2️⃣ **Run Setup Commands (Copy & Paste):**")
-    
-    commands = [
-        "-- Step 1: Enable vector extension",
-        "CREATE EXTENSION IF NOT EXISTS vector;",
-        "",
-        "-- Step 2: Create schema",
-        "CREATE SCHEMA IF NOT EXISTS bedrock_integration;",
-        "",
-        "-- Step 3: Create user",
-        "DO $$ BEGIN CREATE ROLE bedrock_user LOGIN; EXCEPTION WHEN duplicate_object THEN RAISE NOTICE 'Role exists'; END $$;",
-        "",
-        "-- Step 4: Set permissions",
-        "GRANT ALL ON SCHEMA bedrock_integration TO bedrock_user;",
-        "ALTER ROLE bedrock_user PASSWORD 'BedrockUser2024!';",
-        "",
-        "-- Step 5: Create vector table",
-        "CREATE TABLE IF NOT EXISTS bedrock_integration.bedrock_kb (",
-        "    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),",
-        "    embedding vector(1536),",
-        "    chunks text,",
-        "    metadata json",
-        ");",
-        "",
-        "-- Step 6: Create indexes",
-        "CREATE INDEX IF NOT EXISTS bedrock_kb_embedding_idx ON bedrock_integration.bedrock_kb USING hnsw (embedding vector_cosine_ops);",
-        "GRANT ALL ON TABLE bedrock_integration.bedrock_kb TO bedrock_user;",
-    ]
-    
-    for cmd in commands:
-        print(f"   {cmd}")
-    
-    print("\n3️⃣ **Verification Queries:**")
-    verification_queries = [
-        "-- Check if vector extension is installed",
-        "SELECT * FROM pg_extension WHERE extname = 'vector';",
-        "",
-        "-- Check bedrock_integration tables", 
-        "SELECT table_schema || '.' || table_name as show_tables",
-        "FROM information_schema.tables",
-        "WHERE table_type = 'BASE TABLE' AND table_schema = 'bedrock_integration';",
-        "",
-        "-- Check all extensions",
-        "SELECT * FROM pg_extension;",
-        "",
-        "-- Check database version",
-        "SELECT version();"
-    ]
-    
-    for query in verification_queries:
-        print(f"   {query}")
-    
-    print("\n4️⃣ **Expected Results:**")
-    print("   • Vector extension should be listed in pg_extension")
-    print("   • bedrock_integration.bedrock_kb table should exist")
-    print("   • No errors during table/index creation")
+    sys.stdout.write(_MANUAL_EXECUTION_TEXT)
 
 def main():
+    # Send log records to stdout so they interleave correctly with the printed sections
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    
     print("🚀 Enhanced Aurora PostgreSQL Database Setup")
     print("="*60)
     
@@ -148,22 +250,10 @@ def main():
     print(f"🎯 Target Aurora Cluster: my-aurora-serverless")
     print(f"🔐 Using Secret: {secret_arn.split('/')[-1]}")
     
-    # SQL commands to execute
-    setup_commands = [
-        "CREATE EXTENSION IF NOT EXISTS vector;",
-        "CREATE SCHEMA IF NOT EXISTS bedrock_integration;", 
-        "DO $$ BEGIN CREATE ROLE bedrock_user LOGIN; EXCEPTION WHEN duplicate_object THEN RAISE NOTICE 'Role already exists'; END $$;",
-        "GRANT ALL ON SCHEMA bedrock_integration TO bedrock_user;",
-        "ALTER ROLE bedrock_user PASSWORD 'BedrockUser2024!';",
-        """CREATE TABLE IF NOT EXISTS bedrock_integration.bedrock_kb (
-            id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
-            embedding vector(1536),
-            chunks text,
-            metadata json
-        );""",
-        "CREATE INDEX IF NOT EXISTS bedrock_kb_embedding_idx ON bedrock_integration.bedrock_kb USING hnsw (embedding vector_cosine_ops);",
-        "GRANT ALL ON TABLE bedrock_integration.bedrock_kb TO bedrock_user;"
-    ]
+    # Skip statements whose objects already exist so re-runs cost a single probe
+    existing = probe_existing_objects(cluster_arn, secret_arn)
+    pending_waves = filter_setup_waves(SETUP_WAVES, existing)
+    setup_commands = [cmd for wave in pending_waves for cmd in wave]
     
     verification_queries = [
         "SELECT * FROM pg_extension WHERE extname = 'vector';",
@@ -173,25 +263,32 @@ def main():
     print(f"\n📋 Setup Commands ({len(setup_commands)} commands):")
     print("-" * 50)
     
-    success_count = 0
-    
-    # Try to execute setup commands
-    for i, cmd in enumerate(setup_commands, 1):
-        print(f"\n[{i}/{len(setup_commands)}]", end=" ")
-        success, result = execute_sql_with_data_api(cmd, cluster_arn, secret_arn)
+    if not setup_commands:
+        print("✅ All database objects already exist, nothing to do")
+        success = True
+        success_count = 0
+    else:
+        # Send all setup DDL in a single round-trip
+        print("\n[Batch]", end=" ")
+        success, result = execute_sql_with_data_api(RDS_DATA, build_setup_script(setup_commands), cluster_arn, secret_arn)
+        
         if success:
-            success_count += 1
-        time.sleep(1)  # Brief pause between commands
-    
-    print(f"\n📊 Setup Summary: {success_count}/{len(setup_commands)} commands executed successfully")
+            success_count = len(setup_commands)
+        else:
+            print("\n⚠️  Batched setup failed, retrying statement by statement...")
+            success_count = execute_setup_waves(pending_waves, cluster_arn, secret_arn)
+        
+        print(f"\n📊 Setup Summary: {success_count}/{len(setup_commands)} commands executed successfully")
     
-    if success_count > 0:
+    if success or success_count > 0:
         print(f"\n🔍 Running Verification Queries:")
         print("-" * 40)
         
         for i, query in enumerate(verification_queries, 1):
             print(f"\n[Verification {i}]", end=" ")
-            success, result = execute_sql_with_data_api(query, cluster_arn, secret_arn)
+            success, result = execute_sql_with_data_api(
+                RDS_DATA, query, cluster_arn, secret_arn, row_level=logging.INFO
+            )
     else:
         print(f"\n⚠️  Database setup via RDS Data API failed")
         try_alternative_connection()
@@ -4,28 +4,47 @@ Script to set up the Aurora database schema for Bedrock Knowledge Base
 """
 import boto3
 import json
-import time
+from boto_config import BOTO_CONFIG
 
-def execute_sql_statement(rds_client, cluster_arn, secret_arn, sql_statement):
-    """Execute a SQL statement using RDS Data API"""
+def execute_sql_statement(rds_client, cluster_arn, secret_arn, sql_statement, transaction_id=None):
+    """Execute a SQL statement using RDS Data API, optionally within an open transaction"""
     print(f"Executing: {sql_statement}")
     
-    response = rds_client.execute_statement(
-        resourceArn=cluster_arn,
-        secretArn=secret_arn,
-        database='myapp',
-        sql=sql_statement
-    )
+    params = {
+        'resourceArn': cluster_arn,
+        'secretArn': secret_arn,
+        'database': 'myapp',
+        'sql': sql_statement
+    }
+    if transaction_id:
+        params['transactionId'] = transaction_id
+    
+    response = rds_client.execute_statement(**params)
     print(f"Response: {response.get('numberOfRecordsUpdated', 0)} records affected")
     return response
 
+def is_duplicate_error(error):
+    """Return True if the error only reports an object that already exists"""
+    return "duplicate_object" in str(error) or "already exists" in str(error)
+
+def execute_statements_individually(rds_client, cluster_arn, secret_arn, sql_statements):
+    """Execute statements one call at a time, skipping objects that already exist"""
+    for sql in sql_statements:
+        try:
+            execute_sql_statement(rds_client, cluster_arn, secret_arn, sql.strip())
+        except Exception as e:
+            print(f"Error executing SQL: {e}")
+            print(f"SQL was: {sql}")
+            if not is_duplicate_error(e):
+                raise
+
 def main():
     # AWS configuration from terraform outputs
     cluster_arn = "arn:aws:rds:us-west-2:133720367604:cluster:my-aurora-serverless"
     secret_arn = "arn:aws:secretsmanager:us-west-2:133720367604:secret:my-aurora-serverless-1NyjuJ"
     
     # Initialize RDS Data client
-    rds_client = boto3.client('rds-data', region_name='us-west-2')
+    rds_client = boto3.client('rds-data', region_name='us-west-2', config=BOTO_CONFIG)
     
     # SQL statements to create the database schema
     sql_statements = [
@@ -47,15 +66,40 @@ def main():
     
     print("Setting up Aurora database schema for Bedrock Knowledge Base...")
     
-    for sql in sql_statements:
-        try:
-            execute_sql_statement(rds_client, cluster_arn, secret_arn, sql.strip())
-            time.sleep(1)  # Small delay between statements
-        except Exception as e:
-            print(f"Error executing SQL: {e}")
-            print(f"SQL was: {sql}")
-            if "duplicate_object" not in str(e) and "already exists" not in str(e):
+    # Run every statement in one transaction so the Data API authenticates once
+    transaction_id = rds_client.begin_transaction(
+        resourceArn=cluster_arn,
+        secretArn=secret_arn,
+        database='myapp'
+    )['transactionId']
+    
+    try:
+        for sql in sql_statements:
+            try:
+                execute_sql_statement(rds_client, cluster_arn, secret_arn, sql.strip(), transaction_id)
+            except Exception as e:
+                print(f"Error executing SQL: {e}")
+                print(f"SQL was: {sql}")
                 raise
+        
+        rds_client.commit_transaction(
+            resourceArn=cluster_arn,
+            secretArn=secret_arn,
+            transactionId=transaction_id
+        )
+    except Exception as e:
+        rds_client.rollback_transaction(
+            resourceArn=cluster_arn,
+            secretArn=secret_arn,
+            transactionId=transaction_id
+        )
+        if not is_duplicate_error(e):
+            raise
+        
+        # An existing object aborts the whole transaction, so retry one statement
+        # at a time where such errors can be skipped
+        print("Some objects already exist, re-running statements individually...")
+        execute_statements_individually(rds_client, cluster_arn, secret_arn, sql_statements)
     
     print("Database schema setup completed successfully!")
 
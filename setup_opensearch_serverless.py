@@ -4,36 +4,112 @@ Create OpenSearch Serverless Security Policies and Collection
 """
 
 import boto3
+import functools
 import json
+import os
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from botocore.config import Config
 from botocore.exceptions import ClientError
+from boto_config import BOTO_CONFIG
+
+# Local cache of the collection details so unchanged environments skip the lookup
+COLLECTION_CACHE_PATH = os.path.expanduser('~/.cache/opensearch_setup.json')
+COLLECTION_CACHE_TTL = 3600  # seconds
+
+# How long to wait for a new collection to become ACTIVE
+COLLECTION_ACTIVE_TIMEOUT = 600  # seconds
+
+# Shared session so all clients are built from one credential/config resolution
+SESSION = boto3.session.Session(region_name='us-west-2')
+
+@functools.lru_cache(maxsize=1)
+def _caller_arn():
+    """Caller identity ARN; fixed for the lifetime of the process"""
+    sts = SESSION.client('sts', config=BOTO_CONFIG)
+    return sts.get_caller_identity()['Arn']
 
 class OpenSearchServerlessSetup:
+    _COLLECTION_NAME = "heavy-machinery-kb"  # Shortened name
+    
+    # Policy documents are serialized once when the class is defined
+    _ENCRYPTION_POLICY_JSON = json.dumps({
+        "Rules": [
+            {
+                "ResourceType": "collection",
+                "Resource": [f"collection/{_COLLECTION_NAME}"]
+            }
+        ],
+        "AWSOwnedKey": True
+    })
+    
+    _NETWORK_POLICY_JSON = json.dumps([
+        {
+            "Rules": [
+                {
+                    "ResourceType": "collection",
+                    "Resource": [f"collection/{_COLLECTION_NAME}"]
+                },
+                {
+                    "ResourceType": "dashboard",
+                    "Resource": [f"collection/{_COLLECTION_NAME}"]
+                }
+            ],
+            "AllowFromPublic": True
+        }
+    ])
+    
+    # The principal is filled in per caller via str.replace
+    _DATA_ACCESS_POLICY_TEMPLATE = json.dumps([
+        {
+            "Rules": [
+                {
+                    "ResourceType": "collection",
+                    "Resource": [f"collection/{_COLLECTION_NAME}"],
+                    "Permission": [
+                        "aoss:CreateCollectionItems",
+                        "aoss:DeleteCollectionItems", 
+                        "aoss:UpdateCollectionItems",
+                        "aoss:DescribeCollectionItems"
+                    ]
+                },
+                {
+                    "ResourceType": "index",
+                    "Resource": [f"index/{_COLLECTION_NAME}/*"],
+                    "Permission": [
+                        "aoss:CreateIndex",
+                        "aoss:DeleteIndex",
+                        "aoss:UpdateIndex", 
+                        "aoss:DescribeIndex",
+                        "aoss:ReadDocument",
+                        "aoss:WriteDocument"
+                    ]
+                }
+            ],
+            "Principal": ["__PRINCIPAL__"]
+        }
+    ])
+    
     def __init__(self):
         self.region = 'us-west-2'
-        self.opensearch_serverless = boto3.client('opensearchserverless', region_name=self.region)
-        self.collection_name = "heavy-machinery-kb"  # Shortened name
+        self.opensearch_serverless = SESSION.client(
+            'opensearchserverless',
+            region_name=self.region,
+            config=BOTO_CONFIG.merge(Config(retries={'mode': 'adaptive', 'max_attempts': 10}))
+        )
+        self.collection_name = self._COLLECTION_NAME
         self.policy_name = "machinery-kb"  # Shortened for 32 char limit
         
     def create_encryption_policy(self):
         """Create encryption policy for the collection"""
         print("🔧 Creating encryption policy...")
         
-        policy_document = {
-            "Rules": [
-                {
-                    "ResourceType": "collection",
-                    "Resource": [f"collection/{self.collection_name}"]
-                }
-            ],
-            "AWSOwnedKey": True
-        }
-        
         try:
             response = self.opensearch_serverless.create_security_policy(
                 name=f"{self.policy_name}-encryption",
                 type='encryption',
-                policy=json.dumps(policy_document),
+                policy=self._ENCRYPTION_POLICY_JSON,
                 description='Encryption policy for heavy machinery knowledge base collection'
             )
             print(f"✅ Created encryption policy: {response['securityPolicyDetail']['name']}")
@@ -51,27 +127,11 @@ class OpenSearchServerlessSetup:
         """Create network policy for the collection"""
         print("🔧 Creating network policy...")
         
-        policy_document = [
-            {
-                "Rules": [
-                    {
-                        "ResourceType": "collection",
-                        "Resource": [f"collection/{self.collection_name}"]
-                    },
-                    {
-                        "ResourceType": "dashboard",
-                        "Resource": [f"collection/{self.collection_name}"]
-                    }
-                ],
-                "AllowFromPublic": True
-            }
-        ]
-        
         try:
             response = self.opensearch_serverless.create_security_policy(
                 name=f"{self.policy_name}-network",
                 type='network',
-                policy=json.dumps(policy_document),
+                policy=self._NETWORK_POLICY_JSON,
                 description='Network policy for heavy machinery knowledge base collection'
             )
             print(f"✅ Created network policy: {response['securityPolicyDetail']['name']}")
@@ -88,9 +148,7 @@ class OpenSearchServerlessSetup:
     def get_current_user_arn(self):
         """Get current user ARN for data access policy"""
         try:
-            sts = boto3.client('sts', region_name=self.region)
-            identity = sts.get_caller_identity()
-            return identity['Arn']
+            return _caller_arn()
         except Exception as e:
             print(f"❌ Error getting user ARN: {e}")
             return None
@@ -106,41 +164,11 @@ class OpenSearchServerlessSetup:
         
         print(f"   Using principal: {user_arn}")
         
-        policy_document = [
-            {
-                "Rules": [
-                    {
-                        "ResourceType": "collection",
-                        "Resource": [f"collection/{self.collection_name}"],
-                        "Permission": [
-                            "aoss:CreateCollectionItems",
-                            "aoss:DeleteCollectionItems", 
-                            "aoss:UpdateCollectionItems",
-                            "aoss:DescribeCollectionItems"
-                        ]
-                    },
-                    {
-                        "ResourceType": "index",
-                        "Resource": [f"index/{self.collection_name}/*"],
-                        "Permission": [
-                            "aoss:CreateIndex",
-                            "aoss:DeleteIndex",
-                            "aoss:UpdateIndex", 
-                            "aoss:DescribeIndex",
-                            "aoss:ReadDocument",
-                            "aoss:WriteDocument"
-                        ]
-                    }
-                ],
-                "Principal": [user_arn]
-            }
-        ]
-        
         try:
             response = self.opensearch_serverless.create_access_policy(
                 name=f"{self.policy_name}-access",
                 type='data',
-                policy=json.dumps(policy_document),
+                policy=self._DATA_ACCESS_POLICY_TEMPLATE.replace('__PRINCIPAL__', user_arn),
                 description='Data access policy for heavy machinery knowledge base collection'
             )
             print(f"✅ Created data access policy: {response['accessPolicyDetail']['name']}")
@@ -154,61 +182,162 @@ class OpenSearchServerlessSetup:
                 print(f"❌ Error creating data access policy: {e}")
                 return False
     
+    def wait_for_policies(self, max_attempts=10):
+        """Poll with exponential backoff until all three policies can be read back"""
+        client = self.opensearch_serverless
+        for attempt in range(max_attempts):
+            try:
+                client.get_security_policy(name=f"{self.policy_name}-encryption", type='encryption')
+                client.get_security_policy(name=f"{self.policy_name}-network", type='network')
+                client.get_access_policy(name=f"{self.policy_name}-access", type='data')
+                return True
+            except ClientError as e:
+                # Anything but "not visible yet" (e.g. missing aoss:Get* permissions) ends the probe
+                if e.response['Error']['Code'] != 'ResourceNotFoundException':
+                    print(f"⚠️ Could not check policy propagation: {e}")
+                    return False
+            # Delays are capped at 5 s, so the default 10 attempts wait ~32 s at most
+            if attempt < max_attempts - 1:
+                time.sleep(min(5, 0.5 * 2 ** attempt))
+        return False
+    
+    def _cache_key(self):
+        """Account, region and collection name the cached details belong to"""
+        user_arn = self.get_current_user_arn()
+        if not user_arn:
+            return None
+        return {
+            'account_id': user_arn.split(':')[4],
+            'region': self.region,
+            'collection_name': self.collection_name
+        }
+    
+    def _load_cached_collection(self):
+        """Return cached collection details if they are fresh and for this account, region and collection"""
+        key = self._cache_key()
+        if key is None:
+            return None
+        try:
+            if time.time() - os.path.getmtime(COLLECTION_CACHE_PATH) > COLLECTION_CACHE_TTL:
+                return None
+            with open(COLLECTION_CACHE_PATH) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if cached.get('key') != key:
+            return None
+        return cached['collection_info']
+    
+    def _save_cached_collection(self, collection_info):
+        """Write collection details to the local cache, ignoring failures"""
+        key = self._cache_key()
+        if key is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(COLLECTION_CACHE_PATH), exist_ok=True)
+            with open(COLLECTION_CACHE_PATH, 'w') as f:
+                json.dump({'key': key, 'collection_info': collection_info}, f)
+        except OSError as e:
+            print(f"⚠️ Could not write collection cache: {e}")
+    
+    def _invalidate_cached_collection(self):
+        """Remove the cached collection details, e.g. after the collection was deleted"""
+        try:
+            os.remove(COLLECTION_CACHE_PATH)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"⚠️ Could not remove collection cache: {e}")
+    
     def create_collection(self):
         """Create the OpenSearch Serverless collection"""
         print("🔧 Creating OpenSearch Serverless collection...")
         
+        cached = self._load_cached_collection()
+        if cached:
+            print(f"ℹ️ Using cached collection {self.collection_name}: {cached['collection_id']}")
+            return cached
+        
         try:
-            collection_response = self.opensearch_serverless.create_collection(
-                name=self.collection_name,
-                type='VECTORSEARCH',
-                description='Vector collection for heavy machinery knowledge base'
-            )
-            
-            collection_id = collection_response['createCollectionDetail']['id']
-            collection_arn = collection_response['createCollectionDetail']['arn']
+            # Check for an existing collection first instead of relying on ConflictException
+            existing = self.opensearch_serverless.batch_get_collection(
+                names=[self.collection_name]
+            )['collectionDetails']
             
-            print(f"✅ Created OpenSearch collection: {collection_id}")
-            print(f"   ARN: {collection_arn}")
+            if existing:
+                collection_id = existing[0]['id']
+                collection_arn = existing[0]['arn']
+                print(f"ℹ️ Collection {self.collection_name} already exists: {collection_id}")
+                
+                if existing[0]['status'] == 'ACTIVE':
+                    collection_info = {
+                        'collection_id': collection_id,
+                        'collection_arn': collection_arn,
+                        'endpoint': existing[0]['collectionEndpoint']
+                    }
+                    self._save_cached_collection(collection_info)
+                    return collection_info
+            else:
+                collection_response = self.opensearch_serverless.create_collection(
+                    name=self.collection_name,
+                    type='VECTORSEARCH',
+                    description='Vector collection for heavy machinery knowledge base'
+                )
+                
+                collection_id = collection_response['createCollectionDetail']['id']
+                collection_arn = collection_response['createCollectionDetail']['arn']
+                
+                print(f"✅ Created OpenSearch collection: {collection_id}")
+                print(f"   ARN: {collection_arn}")
             
             # Wait for collection to be active
             print("⏳ Waiting for collection to be active...")
-            max_attempts = 20
+            deadline = time.monotonic() + COLLECTION_ACTIVE_TIMEOUT
             attempt = 0
             
-            while attempt < max_attempts:
-                try:
-                    collection_status = self.opensearch_serverless.batch_get_collection(
-                        ids=[collection_id]
-                    )
+            # Transient throttling/5xx errors are retried by botocore; any other ClientError
+            # is terminal and handled below
+            while True:
+                collection_status = self.opensearch_serverless.batch_get_collection(
+                    ids=[collection_id]
+                )
+                
+                if collection_status['collectionDetails']:
+                    status = collection_status['collectionDetails'][0]['status']
+                    print(f"   Collection status: {status}")
                     
-                    if collection_status['collectionDetails']:
-                        status = collection_status['collectionDetails'][0]['status']
-                        print(f"   Collection status: {status}")
-                        
-                        if status == 'ACTIVE':
-                            endpoint = collection_status['collectionDetails'][0]['collectionEndpoint']
-                            print(f"✅ Collection is active with endpoint: {endpoint}")
-                            return {
-                                'collection_id': collection_id,
-                                'collection_arn': collection_arn,
-                                'endpoint': endpoint
-                            }
-                        elif status == 'FAILED':
-                            raise Exception("Collection creation failed")
-                    
-                    attempt += 1
-                    time.sleep(30)
-                    
-                except Exception as e:
-                    print(f"   Error checking status: {e}")
-                    attempt += 1
-                    time.sleep(30)
+                    if status == 'ACTIVE':
+                        endpoint = collection_status['collectionDetails'][0]['collectionEndpoint']
+                        print(f"✅ Collection is active with endpoint: {endpoint}")
+                        collection_info = {
+                            'collection_id': collection_id,
+                            'collection_arn': collection_arn,
+                            'endpoint': endpoint
+                        }
+                        self._save_cached_collection(collection_info)
+                        return collection_info
+                    elif status == 'FAILED':
+                        print(f"❌ Collection {self.collection_name} creation failed")
+                        return None
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                # Back off exponentially: collections usually go active within 1-2 minutes
+                time.sleep(min(30, 2 * 1.5 ** attempt, remaining))
+                attempt += 1
             
-            raise Exception("Collection did not become active within expected time")
+            print(f"❌ Collection {self.collection_name} did not become active within expected time")
+            return None
             
         except ClientError as e:
-            if e.response['Error']['Code'] == 'ConflictException':
+            if e.response['Error']['Code'] == 'ResourceNotFoundException':
+                # The collection is gone, so any cached details for it are stale
+                self._invalidate_cached_collection()
+                print(f"❌ Collection {self.collection_name} not found: {e}")
+                return None
+            elif e.response['Error']['Code'] == 'ConflictException':
                 print(f"ℹ️ Collection {self.collection_name} already exists")
                 # Get existing collection
                 try:
@@ -232,33 +361,40 @@ class OpenSearchServerlessSetup:
         print("🚀 Setting up OpenSearch Serverless for Bedrock Knowledge Base")
         print("=" * 70)
         
-        # Step 1: Create encryption policy
-        if not self.create_encryption_policy():
-            return None
-        
-        # Step 2: Create network policy  
-        if not self.create_network_policy():
-            return None
+        # Resolve the caller ARN up front so it isn't fetched inside the parallel region
+        self.get_current_user_arn()
         
-        # Step 3: Create data access policy
-        if not self.create_data_access_policy():
-            return None
+        # Steps 1-3: Create encryption, network and data access policies in parallel
+        policy_steps = [
+            self.create_encryption_policy,
+            self.create_network_policy,
+            self.create_data_access_policy
+        ]
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(step) for step in policy_steps]
+            for future in as_completed(futures):
+                if not future.result():
+                    return None
         
-        # Wait a bit for policies to propagate
+        # Wait until the policies are visible before creating the collection
         print("⏳ Waiting for policies to propagate...")
-        time.sleep(10)
+        if not self.wait_for_policies():
+            print("⚠️ Policies not visible yet, continuing anyway")
         
         # Step 4: Create collection
         collection_info = self.create_collection()
         
         if collection_info:
-            print("\n" + "=" * 70)
-            print("🎉 OpenSearch Serverless Setup Complete!")
-            print("=" * 70)
-            print(f"Collection Name: {self.collection_name}")
-            print(f"Collection ID: {collection_info['collection_id']}")
-            print(f"Collection ARN: {collection_info['collection_arn']}")
-            print(f"Endpoint: {collection_info.get('endpoint', 'Pending...')}")
+            banner = "=" * 70
+            sys.stdout.write(
+                f"\n{banner}\n"
+                f"🎉 OpenSearch Serverless Setup Complete!\n"
+                f"{banner}\n"
+                f"Collection Name: {self.collection_name}\n"
+                f"Collection ID: {collection_info['collection_id']}\n"
+                f"Collection ARN: {collection_info['collection_arn']}\n"
+                f"Endpoint: {collection_info.get('endpoint', 'Pending...')}\n"
+            )
             
             return collection_info
         else:
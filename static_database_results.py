@@ -4,17 +4,63 @@ Generate Static Database Query Results for Screenshots
 This creates realistic-looking output that matches what you'd see from Aurora PostgreSQL
 """
 
-def display_query_1_extensions():
-    """Display pg_extension query results"""
-    print("=" * 80)
-    print("📊 QUERY 1: SELECT * FROM pg_extension;")
-    print("=" * 80)
-    print()
+import contextlib
+import functools
+import io
+import sys
+
+BAR50 = "=" * 50
+BAR80 = "=" * 80
+
+# Table borders and header rows, one set per query
+TOP_BORDER_Q1 = "┌─────────────────┬──────────────┬─────────────┬──────────────┬──────────────┐"
+HEADER_Q1 = "│ extname         │ extowner     │ extnamespace│ extrelocatable│ extversion   │"
+MID_BORDER_Q1 = "├─────────────────┼──────────────┼─────────────┼──────────────┼──────────────┤"
+BOT_BORDER_Q1 = "└─────────────────┴──────────────┴─────────────┴──────────────┴──────────────┘"
+TOP_BORDER_Q2 = "┌─────────────────────────────────────────┬──────────────┐"
+HEADER_Q2 = "│ show_tables                             │ table_type   │"
+MID_BORDER_Q2 = "├─────────────────────────────────────────┼──────────────┤"
+BOT_BORDER_Q2 = "└─────────────────────────────────────────┴──────────────┘"
+TOP_BORDER_Q3 = "┌─────────────────┬─────────────────────────┬─────────────┬──────────────────────────┐"
+HEADER_Q3 = "│ column_name     │ data_type               │ is_nullable │ column_default           │"
+MID_BORDER_Q3 = "├─────────────────┼─────────────────────────┼─────────────┼──────────────────────────┤"
+BOT_BORDER_Q3 = "└─────────────────┴─────────────────────────┴─────────────┴──────────────────────────┘"
+TOP_BORDER_Q4 = "┌─────────────────────────────────┬─────────────────────────────────────────────────────────────────────┐"
+HEADER_Q4 = "│ indexname                       │ indexdef                                                                │"
+MID_BORDER_Q4 = "├─────────────────────────────────┼─────────────────────────────────────────────────────────────────────┤"
+BOT_BORDER_Q4 = "└─────────────────────────────────┴─────────────────────────────────────────────────────────────────────┘"
+TOP_BORDER_Q5 = "┌──────────────────────────────────────┬────────────────────────────────────────────────────┬─────────────────────────────────┬──────────────┬─────────────────────┐"
+HEADER_Q5 = "│ id                                   │ chunk_preview                                          │ source_file                     │ equipment    │ created_at          │"
+MID_BORDER_Q5 = "├──────────────────────────────────────┼────────────────────────────────────────────────────┼─────────────────────────────────┼──────────────┼─────────────────────┤"
+BOT_BORDER_Q5 = "└──────────────────────────────────────┴────────────────────────────────────────────────────┴─────────────────────────────────┴──────────────┴─────────────────────┘"
+TOP_BORDER_VERSION = "┌─────────────────────────────────────────────────────────────────────────────────────────────────────────────────────┐"
+HEADER_VERSION = "│ version                                                                                                                 │"
+MID_BORDER_VERSION = "├─────────────────────────────────────────────────────────────────────────────────────────────────────────────────────┤"
+ROW_VERSION = "│ PostgreSQL 15.4 on x86_64-pc-linux-gnu, compiled by gcc (GCC) 7.3.0, 64-bit                                         │"
+BOT_BORDER_VERSION = "└─────────────────────────────────────────────────────────────────────────────────────────────────────────────────────┘"
+
+# Row templates for the query 3-5 tables, parsed once and reused for every row
+ROW_Q3 = "│ {:<15} │ {:<23} │ {:<11} │ {:<24} │"
+ROW_Q4 = "│ {:<31} │ {:<67} │"
+ROW_Q5 = "│ {:<36} │ {:<50} │ {:<31} │ {:<12} │ {:<19} │"
+
+def _truncate(text, width):
+    """Shorten text to width characters, marking the cut with an ellipsis"""
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+@functools.cache
+def _render_query_1_extensions():
+    """Render pg_extension query results as a string"""
+    out = []
+    out.append(BAR80)
+    out.append("📊 QUERY 1: SELECT * FROM pg_extension;")
+    out.append(BAR80)
+    out.append("")
     
     # Table header
-    print("┌─────────────────┬──────────────┬─────────────┬──────────────┬──────────────┐")
-    print("│ extname         │ extowner     │ extnamespace│ extrelocatable│ extversion   │")
-    print("├─────────────────┼──────────────┼─────────────┼──────────────┼──────────────┤")
+    out.append(TOP_BORDER_Q1)
+    out.append(HEADER_Q1)
+    out.append(MID_BORDER_Q1)
     
     # Extension data
     extensions = [
@@ -24,21 +70,24 @@ def display_query_1_extensions():
         ("pg_stat_statements", "10", "11", "t", "1.10")
     ]
     
-    for ext in extensions:
-        print(f"│ {ext[0]:<15} │ {ext[1]:<12} │ {ext[2]:<11} │ {ext[3]:<12} │ {ext[4]:<12} │")
+    out.extend([f"│ {ext[0]:<15} │ {ext[1]:<12} │ {ext[2]:<11} │ {ext[3]:<12} │ {ext[4]:<12} │" for ext in extensions])
+    
+    out.append(BOT_BORDER_Q1)
+    out.append("(4 rows)")
+    out.append("")
+    out.append("✅ Vector extension is installed and available!")
+    out.append("")
     
-    print("└─────────────────┴──────────────┴─────────────┴──────────────┴──────────────┘")
-    print("(4 rows)")
-    print()
-    print("✅ Vector extension is installed and available!")
-    print()
+    return "\n".join(out) + "\n"
 
-def display_query_2_bedrock_tables():
-    """Display bedrock_integration schema tables"""
-    print("=" * 80)
-    print("📊 QUERY 2: Check bedrock_integration schema tables")
-    print("=" * 80)
-    print()
+@functools.cache
+def _render_query_2_bedrock_tables():
+    """Render bedrock_integration schema tables as a string"""
+    out = []
+    out.append(BAR80)
+    out.append("📊 QUERY 2: Check bedrock_integration schema tables")
+    out.append(BAR80)
+    out.append("")
     
     query_text = """SELECT 
     table_schema || '.' || table_name as show_tables,
@@ -50,14 +99,14 @@ WHERE
 AND 
     table_schema = 'bedrock_integration';"""
     
-    print("Query:")
-    print(query_text)
-    print()
+    out.append("Query:")
+    out.append(query_text)
+    out.append("")
     
     # Table header
-    print("┌─────────────────────────────────────────┬──────────────┐")
-    print("│ show_tables                             │ table_type   │")
-    print("├─────────────────────────────────────────┼──────────────┤")
+    out.append(TOP_BORDER_Q2)
+    out.append(HEADER_Q2)
+    out.append(MID_BORDER_Q2)
     
     # Table data
     tables = [
@@ -67,21 +116,24 @@ AND
         ("bedrock_integration.vector_metadata", "BASE TABLE")
     ]
     
-    for table in tables:
-        print(f"│ {table[0]:<39} │ {table[1]:<12} │")
+    out.extend([f"│ {table[0]:<39} │ {table[1]:<12} │" for table in tables])
     
-    print("└─────────────────────────────────────────┴──────────────┘")
-    print("(4 rows)")
-    print()
-    print("✅ bedrock_integration schema with vector tables created!")
-    print()
+    out.append(BOT_BORDER_Q2)
+    out.append("(4 rows)")
+    out.append("")
+    out.append("✅ bedrock_integration schema with vector tables created!")
+    out.append("")
+    
+    return "\n".join(out) + "\n"
 
-def display_query_3_bedrock_kb_structure():
-    """Display bedrock_kb table structure"""
-    print("=" * 80)
-    print("📊 QUERY 3: Check bedrock_kb table structure")
-    print("=" * 80)
-    print()
+@functools.cache
+def _render_query_3_bedrock_kb_structure():
+    """Render bedrock_kb table structure as a string"""
+    out = []
+    out.append(BAR80)
+    out.append("📊 QUERY 3: Check bedrock_kb table structure")
+    out.append(BAR80)
+    out.append("")
     
     query_text = """SELECT 
     column_name,
@@ -97,14 +149,14 @@ AND
 ORDER BY 
     ordinal_position;"""
     
-    print("Query:")
-    print(query_text)
-    print()
+    out.append("Query:")
+    out.append(query_text)
+    out.append("")
     
     # Table header
-    print("┌─────────────────┬─────────────────────────┬─────────────┬──────────────────────────┐")
-    print("│ column_name     │ data_type               │ is_nullable │ column_default           │")
-    print("├─────────────────┼─────────────────────────┼─────────────┼──────────────────────────┤")
+    out.append(TOP_BORDER_Q3)
+    out.append(HEADER_Q3)
+    out.append(MID_BORDER_Q3)
     
     # Column data
     columns = [
@@ -118,24 +170,27 @@ ORDER BY
         ("updated_at", "timestamp without time zone", "YES", "CURRENT_TIMESTAMP")
     ]
     
-    for col in columns:
-        default_val = col[3] if col[3] else "NULL"
-        if len(default_val) > 24:
-            default_val = default_val[:21] + "..."
-        print(f"│ {col[0]:<15} │ {col[1]:<23} │ {col[2]:<11} │ {default_val:<24} │")
-    
-    print("└─────────────────┴─────────────────────────┴─────────────┴──────────────────────────┘")
-    print("(8 rows)")
-    print()
-    print("✅ bedrock_kb table properly configured for vector embeddings!")
-    print()
+    out.extend([
+        ROW_Q3.format(col[0], col[1], col[2], _truncate(col[3] or 'NULL', 24))
+        for col in columns
+    ])
+    
+    out.append(BOT_BORDER_Q3)
+    out.append("(8 rows)")
+    out.append("")
+    out.append("✅ bedrock_kb table properly configured for vector embeddings!")
+    out.append("")
+    
+    return "\n".join(out) + "\n"
 
-def display_query_4_indexes():
-    """Display indexes on bedrock_kb table"""
-    print("=" * 80)
-    print("📊 QUERY 4: Check indexes on bedrock_kb table")
-    print("=" * 80)
-    print()
+@functools.cache
+def _render_query_4_indexes():
+    """Render indexes on bedrock_kb table as a string"""
+    out = []
+    out.append(BAR80)
+    out.append("📊 QUERY 4: Check indexes on bedrock_kb table")
+    out.append(BAR80)
+    out.append("")
     
     query_text = """SELECT 
     indexname,
@@ -147,14 +202,14 @@ WHERE
 AND 
     tablename = 'bedrock_kb';"""
     
-    print("Query:")
-    print(query_text)
-    print()
+    out.append("Query:")
+    out.append(query_text)
+    out.append("")
     
     # Table header
-    print("┌─────────────────────────────────┬─────────────────────────────────────────────────────────────────────┐")
-    print("│ indexname                       │ indexdef                                                                │")
-    print("├─────────────────────────────────┼─────────────────────────────────────────────────────────────────────┤")
+    out.append(TOP_BORDER_Q4)
+    out.append(HEADER_Q4)
+    out.append(MID_BORDER_Q4)
     
     # Index data
     indexes = [
@@ -164,24 +219,24 @@ AND
         ("bedrock_kb_created_at_idx", "CREATE INDEX bedrock_kb_created_at_idx ON bedrock_integration.bedrock_kb USING btree (created_at)")
     ]
     
-    for idx in indexes:
-        indexdef = idx[1]
-        if len(indexdef) > 69:
-            indexdef = indexdef[:66] + "..."
-        print(f"│ {idx[0]:<31} │ {indexdef:<67} │")
-    
-    print("└─────────────────────────────────┴─────────────────────────────────────────────────────────────────────┘")
-    print("(4 rows)")
-    print()
-    print("✅ HNSW vector index and supporting indexes created!")
-    print()
+    out.extend([ROW_Q4.format(idx[0], _truncate(idx[1], 69)) for idx in indexes])
+    
+    out.append(BOT_BORDER_Q4)
+    out.append("(4 rows)")
+    out.append("")
+    out.append("✅ HNSW vector index and supporting indexes created!")
+    out.append("")
+    
+    return "\n".join(out) + "\n"
 
-def display_query_5_sample_data():
-    """Display sample data in bedrock_kb table"""
-    print("=" * 80)
-    print("📊 QUERY 5: Sample data in bedrock_kb table")
-    print("=" * 80)
-    print()
+@functools.cache
+def _render_query_5_sample_data():
+    """Render sample data in bedrock_kb table as a string"""
+    out = []
+    out.append(BAR80)
+    out.append("📊 QUERY 5: Sample data in bedrock_kb table")
+    out.append(BAR80)
+    out.append("")
     
     query_text = """SELECT 
     id,
@@ -193,14 +248,14 @@ FROM
     bedrock_integration.bedrock_kb 
 LIMIT 5;"""
     
-    print("Query:")
-    print(query_text)
-    print()
+    out.append("Query:")
+    out.append(query_text)
+    out.append("")
     
     # Table header
-    print("┌──────────────────────────────────────┬────────────────────────────────────────────────────┬─────────────────────────────────┬──────────────┬─────────────────────┐")
-    print("│ id                                   │ chunk_preview                                          │ source_file                     │ equipment    │ created_at          │")
-    print("├──────────────────────────────────────┼────────────────────────────────────────────────────┼─────────────────────────────────┼──────────────┼─────────────────────┤")
+    out.append(TOP_BORDER_Q5)
+    out.append(HEADER_Q5)
+    out.append(MID_BORDER_Q5)
     
     # Sample data
     sample_data = [
@@ -211,75 +266,90 @@ LIMIT 5;"""
         ("e5f6g7h8-i9j0-1234-ef12-345678901234", "The X950 Excavator is a 95-ton class hydrauli...", "excavator-x950-spec-sheet.pdf", "X950", "2024-10-01 15:30:49")
     ]
     
-    for row in sample_data:
-        print(f"│ {row[0]:<36} │ {row[1]:<50} │ {row[2]:<31} │ {row[3]:<12} │ {row[4]:<19} │")
+    out.extend([ROW_Q5.format(*row) for row in sample_data])
+    
+    out.append(BOT_BORDER_Q5)
+    out.append("(5 rows)")
+    out.append("")
+    out.append("✅ Vector embeddings and document chunks successfully stored!")
+    out.append("")
     
-    print("└──────────────────────────────────────┴────────────────────────────────────────────────────┴─────────────────────────────────┴──────────────┴─────────────────────┘")
-    print("(5 rows)")
-    print()
-    print("✅ Vector embeddings and document chunks successfully stored!")
-    print()
+    return "\n".join(out) + "\n"
 
-def display_database_version():
-    """Display database version"""
-    print("=" * 80)
-    print("📊 DATABASE VERSION")
-    print("=" * 80)
-    print()
-    
-    print("Query: SELECT version();")
-    print()
-    print("┌─────────────────────────────────────────────────────────────────────────────────────────────────────────────────────┐")
-    print("│ version                                                                                                                 │")
-    print("├─────────────────────────────────────────────────────────────────────────────────────────────────────────────────────┤")
-    print("│ PostgreSQL 15.4 on x86_64-pc-linux-gnu, compiled by gcc (GCC) 7.3.0, 64-bit                                         │")
-    print("└─────────────────────────────────────────────────────────────────────────────────────────────────────────────────────┘")
-    print("(1 row)")
-    print()
+@functools.cache
+def _render_database_version():
+    """Render database version as a string"""
+    out = []
+    out.append(BAR80)
+    out.append("📊 DATABASE VERSION")
+    out.append(BAR80)
+    out.append("")
+    
+    out.append("Query: SELECT version();")
+    out.append("")
+    out.append(TOP_BORDER_VERSION)
+    out.append(HEADER_VERSION)
+    out.append(MID_BORDER_VERSION)
+    out.append(ROW_VERSION)
+    out.append(BOT_BORDER_VERSION)
+    out.append("(1 row)")
+    out.append("")
+    
+    return "\n".join(out) + "\n"
 
-def display_connection_info():
-    """Display connection information"""
-    print("🔌 CONNECTION INFORMATION")
-    print("=" * 50)
-    print("Host: my-aurora-serverless.cluster-cu2bffdza994.us-west-2.rds.amazonaws.com")
-    print("Port: 5432")
-    print("Database: myapp")
-    print("User: dbadmin")
-    print("SSL: require")
-    print("Connection Status: ✅ Connected")
-    print()
+@functools.cache
+def _render_connection_info():
+    """Render connection information as a string"""
+    out = []
+    out.append("🔌 CONNECTION INFORMATION")
+    out.append(BAR50)
+    out.append("Host: my-aurora-serverless.cluster-cu2bffdza994.us-west-2.rds.amazonaws.com")
+    out.append("Port: 5432")
+    out.append("Database: myapp")
+    out.append("User: dbadmin")
+    out.append("SSL: require")
+    out.append("Connection Status: ✅ Connected")
+    out.append("")
+    
+    return "\n".join(out) + "\n"
 
 def main():
     """Generate all static database query results"""
     
-    print("🚀 Aurora PostgreSQL Database Verification Results")
-    print("🎯 Heavy Machinery Knowledge Base - Vector Database")
-    print("📅 Generated on: October 1, 2024 at 15:35:22 UTC")
-    print("=" * 80)
-    print()
-    
-    display_connection_info()
-    display_database_version()
-    display_query_1_extensions()
-    display_query_2_bedrock_tables()
-    display_query_3_bedrock_kb_structure()
-    display_query_4_indexes()
-    display_query_5_sample_data()
-    
-    print("=" * 80)
-    print("🎉 DATABASE VERIFICATION SUMMARY")
-    print("=" * 80)
-    print("✅ Vector extension (v0.5.1) - INSTALLED")
-    print("✅ bedrock_integration schema - CREATED")
-    print("✅ bedrock_kb table with vector(1536) - CONFIGURED")
-    print("✅ HNSW vector index - OPTIMIZED FOR SIMILARITY SEARCH")
-    print("✅ Sample document chunks - LOADED (5 machinery types)")
-    print("✅ Metadata and JSON support - ENABLED")
-    print()
-    print("🔥 Database is ready for AWS Bedrock Knowledge Base integration!")
-    print("🚀 Total vector embeddings: 15+ chunks from heavy machinery documents")
-    print("📊 Index type: HNSW (Hierarchical Navigable Small World) for fast similarity search")
-    print("=" * 80)
+    # Collect all output in memory and write it to the terminal once
+    stdout = sys.stdout
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        print("🚀 Aurora PostgreSQL Database Verification Results")
+        print("🎯 Heavy Machinery Knowledge Base - Vector Database")
+        print("📅 Generated on: October 1, 2024 at 15:35:22 UTC")
+        print(BAR80)
+        print()
+        
+        sys.stdout.write(_render_connection_info())
+        sys.stdout.write(_render_database_version())
+        sys.stdout.write(_render_query_1_extensions())
+        sys.stdout.write(_render_query_2_bedrock_tables())
+        sys.stdout.write(_render_query_3_bedrock_kb_structure())
+        sys.stdout.write(_render_query_4_indexes())
+        sys.stdout.write(_render_query_5_sample_data())
+        
+        print(BAR80)
+        print("🎉 DATABASE VERIFICATION SUMMARY")
+        print(BAR80)
+        print("✅ Vector extension (v0.5.1) - INSTALLED")
+        print("✅ bedrock_integration schema - CREATED")
+        print("✅ bedrock_kb table with vector(1536) - CONFIGURED")
+        print("✅ HNSW vector index - OPTIMIZED FOR SIMILARITY SEARCH")
+        print("✅ Sample document chunks - LOADED (5 machinery types)")
+        print("✅ Metadata and JSON support - ENABLED")
+        print()
+        print("🔥 Database is ready for AWS Bedrock Knowledge Base integration!")
+        print("🚀 Total vector embeddings: 15+ chunks from heavy machinery documents")
+        print("📊 Index type: HNSW (Hierarchical Navigable Small World) for fast similarity search")
+        print(BAR80)
+    
+    stdout.write(buf.getvalue())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -4,33 +4,103 @@ Database Query Executor for Aurora PostgreSQL
 Tests database connectivity and runs verification queries
 """
 
-import boto3
+import importlib.util
 import json
+import os
 import sys
-from botocore.exceptions import ClientError
+import time
 
+# boto3 and psycopg2 are slow to import, so they are only loaded when a
+# connection is actually attempted
+PSYCOPG2_AVAILABLE = importlib.util.find_spec("psycopg2") is not None
+
+# Use orjson for parsing secrets when it is installed, otherwise fall back to json
 try:
-    import psycopg2
-    PSYCOPG2_AVAILABLE = True
+    import orjson
+    _json_loads = orjson.loads
 except ImportError:
-    PSYCOPG2_AVAILABLE = False
+    _json_loads = json.loads
+
+BAR50 = "=" * 50
+BAR70 = "=" * 70
+
+# Decrypted credentials are cached briefly so repeated runs skip Secrets Manager
+CREDENTIALS_CACHE_PATH = os.path.expanduser('~/.cache/aurora_creds.json')
+CREDENTIALS_CACHE_TTL = 300  # seconds
+
+# All verification checks in one round-trip, returned as a single JSON document
+VERIFICATION_QUERY = """
+    SELECT json_build_object(
+        'extensions', (SELECT json_agg(json_build_array(extname, extversion)) FROM pg_extension),
+        'tables', (
+            SELECT json_agg(table_schema || '.' || table_name)
+            FROM information_schema.tables
+            WHERE table_type = 'BASE TABLE'
+            AND table_schema = 'bedrock_integration'
+        ),
+        'schemas', (SELECT json_agg(schema_name ORDER BY schema_name) FROM information_schema.schemata),
+        'version', version(),
+        -- pg_settings hides settings the role may not read instead of raising,
+        -- so one restricted value cannot fail the whole document
+        'libs', (SELECT setting FROM pg_settings WHERE name = 'shared_preload_libraries')
+    )
+"""
+
+def _load_cached_credentials():
+    """Return cached credentials if the cache file is fresh"""
+    try:
+        if time.time() - os.path.getmtime(CREDENTIALS_CACHE_PATH) > CREDENTIALS_CACHE_TTL:
+            return None
+        with open(CREDENTIALS_CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _save_cached_credentials(credentials):
+    """Atomically write credentials to the cache, readable by the owner only"""
+    tmp_path = CREDENTIALS_CACHE_PATH + '.tmp'
+    try:
+        os.makedirs(os.path.dirname(CREDENTIALS_CACHE_PATH), exist_ok=True)
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(credentials, f)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, CREDENTIALS_CACHE_PATH)
+    except OSError as e:
+        print(f"⚠️ Could not write credentials cache: {e}")
+
+def invalidate_cached_credentials():
+    """Remove cached credentials, e.g. after the password was rejected"""
+    try:
+        os.remove(CREDENTIALS_CACHE_PATH)
+    except FileNotFoundError:
+        pass
 
 def get_database_credentials():
     """Get database credentials from AWS Secrets Manager"""
+    cached = _load_cached_credentials()
+    if cached:
+        return cached
+    
+    import boto3
+    from botocore.exceptions import ClientError
+    
     try:
         secret_arn = "arn:aws:secretsmanager:us-west-2:133720367604:secret:my-aurora-serverless-1NyjuJ"
         secretsmanager = boto3.client('secretsmanager', region_name='us-west-2')
         
         response = secretsmanager.get_secret_value(SecretId=secret_arn)
-        secret_data = json.loads(response['SecretString'])
+        secret_data = _json_loads(response['SecretString'])
         
-        return {
+        credentials = {
             'host': secret_data.get('host', 'my-aurora-serverless.cluster-cu2bffdza994.us-west-2.rds.amazonaws.com'),
             'database': secret_data.get('db', 'myapp'),
             'username': secret_data.get('username', 'dbadmin'),
             'password': secret_data.get('password'),
             'port': secret_data.get('port', 5432)
         }
+        _save_cached_credentials(credentials)
+        return credentials
     except ClientError as e:
         print(f"❌ Error getting credentials: {e}")
         return None
@@ -41,6 +111,8 @@ def run_verification_queries_direct(conn_info):
         print("❌ psycopg2 not available. Please install it with: pip install psycopg2-binary")
         return False
     
+    import psycopg2
+    
     try:
         # Connect to database
         print("🔗 Connecting to Aurora PostgreSQL...")
@@ -51,65 +123,54 @@ def run_verification_queries_direct(conn_info):
             password=conn_info['password'],
             port=conn_info['port']
         )
+        # Read-only checks need no transaction; autocommit skips the implicit BEGIN round-trip
+        conn.autocommit = True
         
         cursor = conn.cursor()
         print("✅ Connected successfully!")
         
-        # Query 1: Check extensions
-        print("\n📋 Query 1: Checking PostgreSQL extensions")
-        print("=" * 50)
-        cursor.execute("SELECT * FROM pg_extension;")
-        extensions = cursor.fetchall()
+        # Run every check in one query; psycopg2 decodes the json result into a dict
+        cursor.execute(VERIFICATION_QUERY)
+        info = cursor.fetchone()[0]
         
-        print("Extensions installed:")
-        for ext in extensions:
-            print(f"   - {ext[0]} (version: {ext[1]})")
+        # Query 1: Check extensions (json_agg yields NULL for an empty set)
+        extensions = info['extensions'] or []
+        
+        # Each section is collected and flushed with a single write
+        out = ["\n📋 Query 1: Checking PostgreSQL extensions", BAR50, "Extensions installed:"]
+        out.extend([f"   - {ext[0]} (version: {ext[1]})" for ext in extensions])
             
         # Check specifically for vector extension
-        cursor.execute("SELECT * FROM pg_extension WHERE extname = 'vector';")
-        vector_ext = cursor.fetchall()
-        if vector_ext:
-            print("✅ Vector extension is installed!")
+        if any(ext[0] == 'vector' for ext in extensions):
+            out.append("✅ Vector extension is installed!")
         else:
-            print("❌ Vector extension is NOT installed!")
+            out.append("❌ Vector extension is NOT installed!")
+        sys.stdout.write("\n".join(out) + "\n")
         
         # Query 2: Check bedrock_integration schema tables
-        print("\n📋 Query 2: Checking bedrock_integration schema")
-        print("=" * 50)
-        cursor.execute("""
-            SELECT table_schema || '.' || table_name as show_tables
-            FROM information_schema.tables
-            WHERE table_type = 'BASE TABLE'
-            AND table_schema = 'bedrock_integration'
-        """)
-        
-        tables = cursor.fetchall()
+        tables = info['tables'] or []
+        out = ["\n📋 Query 2: Checking bedrock_integration schema", BAR50]
         if tables:
-            print("Tables in bedrock_integration schema:")
-            for table in tables:
-                print(f"   - {table[0]}")
+            out.append("Tables in bedrock_integration schema:")
+            out.extend([f"   - {table}" for table in tables])
         else:
-            print("❌ No tables found in bedrock_integration schema")
+            out.append("❌ No tables found in bedrock_integration schema")
+        sys.stdout.write("\n".join(out) + "\n")
         
         # Query 3: Check all schemas
-        print("\n📋 Query 3: All available schemas")
-        print("=" * 50)
-        cursor.execute("SELECT schema_name FROM information_schema.schemata ORDER BY schema_name;")
-        schemas = cursor.fetchall()
-        print("Available schemas:")
-        for schema in schemas:
-            print(f"   - {schema[0]}")
+        schemas = info['schemas'] or []
+        out = ["\n📋 Query 3: All available schemas", BAR50, "Available schemas:"]
+        out.extend([f"   - {schema}" for schema in schemas])
+        sys.stdout.write("\n".join(out) + "\n")
         
         # Query 4: Check database version and settings
-        print("\n📋 Query 4: Database information")
-        print("=" * 50)
-        cursor.execute("SELECT version();")
-        version = cursor.fetchone()
-        print(f"PostgreSQL Version: {version[0]}")
-        
-        cursor.execute("SHOW shared_preload_libraries;")
-        libs = cursor.fetchone()
-        print(f"Shared preload libraries: {libs[0]}")
+        out = [
+            "\n📋 Query 4: Database information",
+            BAR50,
+            f"PostgreSQL Version: {info['version']}",
+            f"Shared preload libraries: {info['libs'] or 'not visible to this role'}"
+        ]
+        sys.stdout.write("\n".join(out) + "\n")
         
         cursor.close()
         conn.close()
@@ -117,14 +178,49 @@ def run_verification_queries_direct(conn_info):
         return True
         
     except Exception as e:
+        # A rejected password means the cached secret may be stale
+        if isinstance(e, psycopg2.OperationalError) and 'authentication failed' in str(e):
+            invalidate_cached_credentials()
         print(f"❌ Database connection error: {e}")
         return False
 
+# Verification SQL and help text shown by provide_manual_instructions, formatted once
+_MANUAL_QUERIES = (
+    ("Check all extensions", "SELECT * FROM pg_extension;"),
+    ("Check vector extension specifically", "SELECT * FROM pg_extension WHERE extname = 'vector';"),
+    ("Check bedrock_integration tables", """
+SELECT table_schema || '.' || table_name as show_tables
+FROM information_schema.tables
+WHERE table_type = 'BASE TABLE'
+AND table_schema = 'bedrock_integration';"""),
+    ("Check all schemas", "SELECT schema_name FROM information_schema.schemata ORDER BY schema_name;"),
+    ("Check database version", "SELECT version();"),
+    ("Check shared libraries", "SHOW shared_preload_libraries;")
+)
+_MANUAL_QUERIES_TEXT = "".join(
+    f"\n{i}. {desc}:\n   " + query.replace("\n", "\n   ") + "\n"
+    for i, (desc, query) in enumerate(_MANUAL_QUERIES, 1)
+)
+
+_MANUAL_HELP_TEXT = (
+    "\n📋 SQL Queries to Run:\n"
+    + "=" * 40 + "\n"
+    + _MANUAL_QUERIES_TEXT +
+    "\n🔧 To set up the vector database, run all commands from:\n"
+    "   setup_vector_database.sql\n"
+    "\n💡 AWS RDS Query Editor Steps:\n"
+    "   1. Go to AWS Console → RDS → Databases\n"
+    "   2. Click on 'my-aurora-serverless'\n"
+    "   3. Click 'Query Editor' tab\n"
+    "   4. Connect using database credentials\n"
+    "   5. Run the SQL commands above\n"
+)
+
 def provide_manual_instructions(conn_info):
     """Provide manual instructions for running queries"""
-    print("\n" + "=" * 70)
+    print("\n" + BAR70)
     print("📝 MANUAL DATABASE QUERY INSTRUCTIONS")
-    print("=" * 70)
+    print(BAR70)
     
     if conn_info:
         print(f"\n🔗 Connection Information:")
@@ -134,39 +230,11 @@ def provide_manual_instructions(conn_info):
         print(f"   Port: {conn_info['port']}")
         print("   Password: (retrieved from AWS Secrets Manager)")
     
-    print(f"\n📋 SQL Queries to Run:")
-    print("=" * 40)
-    
-    queries = [
-        ("Check all extensions", "SELECT * FROM pg_extension;"),
-        ("Check vector extension specifically", "SELECT * FROM pg_extension WHERE extname = 'vector';"),
-        ("Check bedrock_integration tables", """
-SELECT table_schema || '.' || table_name as show_tables
-FROM information_schema.tables
-WHERE table_type = 'BASE TABLE'
-AND table_schema = 'bedrock_integration';"""),
-        ("Check all schemas", "SELECT schema_name FROM information_schema.schemata ORDER BY schema_name;"),
-        ("Check database version", "SELECT version();"),
-        ("Check shared libraries", "SHOW shared_preload_libraries;")
-    ]
-    
-    for i, (desc, query) in enumerate(queries, 1):
-        print(f"\n{i}. {desc}:")
-        print("   " + query.replace("\n", "\n   "))
-    
-    print(f"\n🔧 To set up the vector database, run all commands from:")
-    print("   setup_vector_database.sql")
-    
-    print(f"\n💡 AWS RDS Query Editor Steps:")
-    print("   1. Go to AWS Console → RDS → Databases")
-    print("   2. Click on 'my-aurora-serverless'")
-    print("   3. Click 'Query Editor' tab")
-    print("   4. Connect using database credentials")
-    print("   5. Run the SQL commands above")
+    sys.stdout.write(_MANUAL_HELP_TEXT)
 
 def main():
     print("🔍 Aurora PostgreSQL Database Verification")
-    print("=" * 50)
+    print(BAR50)
     
     # Get database credentials
     conn_info = get_database_credentials()
@@ -189,9 +257,9 @@ def main():
     # Provide manual instructions
     provide_manual_instructions(conn_info)
     
-    print(f"\n" + "=" * 70)
+    print(f"\n" + BAR70)
     print("🎯 NEXT STEPS")
-    print("=" * 70)
+    print(BAR70)
     print("1. Connect to Aurora PostgreSQL using AWS RDS Query Editor")
     print("2. Run the setup commands from setup_vector_database.sql")
     print("3. Run the verification queries listed above")
@@ -5,15 +5,22 @@ Test script to validate Knowledge Base functionality
 
 import boto3
 import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from botocore.exceptions import ClientError
+from boto_config import BOTO_CONFIG
+
+BAR50 = "=" * 50
+
+# Clients are created once at import and shared by every test
+_BEDROCK_AGENT = boto3.client('bedrock-agent', region_name='us-west-2', config=BOTO_CONFIG)
+_BEDROCK_RUNTIME = boto3.client('bedrock-agent-runtime', region_name='us-west-2', config=BOTO_CONFIG)
 
 def test_knowledge_base_status(kb_id):
     """Test Knowledge Base status and configuration"""
     try:
-        bedrock_agent = boto3.client('bedrock-agent', region_name='us-west-2')
-        
         # Get Knowledge Base details
-        response = bedrock_agent.get_knowledge_base(knowledgeBaseId=kb_id)
+        response = _BEDROCK_AGENT.get_knowledge_base(knowledgeBaseId=kb_id)
         kb_info = response['knowledgeBase']
         
         print(f"✅ Knowledge Base Status: {kb_info['status']}")
@@ -23,12 +30,17 @@ def test_knowledge_base_status(kb_id):
         print(f"   Updated: {kb_info.get('updatedAt', 'N/A')}")
         
         # Get data sources
-        data_sources = bedrock_agent.list_data_sources(knowledgeBaseId=kb_id)
-        print(f"   Data Sources: {len(data_sources['dataSourceSummaries'])}")
-        
-        for ds in data_sources['dataSourceSummaries']:
-            print(f"     - {ds['name']}: {ds['status']}")
-            print(f"       Description: {ds.get('description', 'N/A')}")
+        data_sources = _BEDROCK_AGENT.list_data_sources(knowledgeBaseId=kb_id)
+        summaries = data_sources['dataSourceSummaries']
+        
+        # Print the count and every data source in a single call
+        print("\n".join(
+            [f"   Data Sources: {len(summaries)}"]
+            + [
+                f"     - {ds['name']}: {ds['status']}\n       Description: {ds.get('description', 'N/A')}"
+                for ds in summaries
+            ]
+        ))
         
         return True
         
@@ -38,10 +50,10 @@ def test_knowledge_base_status(kb_id):
 
 def test_bedrock_retrieval(kb_id, query):
     """Test Knowledge Base retrieval directly"""
+    # Buffer the report so concurrent calls don't interleave their output
+    out = [f"\n   Testing query: '{query}'"]
     try:
-        bedrock_agent_runtime = boto3.client('bedrock-agent-runtime', region_name='us-west-2')
-        
-        response = bedrock_agent_runtime.retrieve(
+        response = _BEDROCK_RUNTIME.retrieve(
             knowledgeBaseId=kb_id,
             retrievalQuery={
                 'text': query
@@ -53,31 +65,33 @@ def test_bedrock_retrieval(kb_id, query):
             }
         )
         
-        print(f"✅ Retrieved {len(response['retrievalResults'])} results for: '{query}'")
+        out.append(f"✅ Retrieved {len(response['retrievalResults'])} results for: '{query}'")
         
         for i, result in enumerate(response['retrievalResults'], 1):
-            print(f"   Result {i}:")
-            print(f"     Score: {result['score']:.3f}")
-            print(f"     Content: {result['content']['text'][:150]}...")
+            out.append(f"   Result {i}:")
+            out.append(f"     Score: {result['score']:.3f}")
+            out.append(f"     Content: {result['content']['text']:.150}...")
             if 'location' in result:
                 location = result['location']
                 if 's3Location' in location:
                     s3_uri = location['s3Location'].get('uri', 'Unknown')
-                    print(f"     Source: {s3_uri}")
-            print()
+                    out.append(f"     Source: {s3_uri}")
+            out.append("")
         
         return len(response['retrievalResults']) > 0
         
     except ClientError as e:
-        print(f"❌ Retrieval error: {e}")
+        out.append(f"❌ Retrieval error: {e}")
         return False
+    
+    finally:
+        sys.stdout.write("\n".join(out) + "\n")
 
 def test_generate_with_kb(kb_id, query):
     """Test Knowledge Base with generation"""
+    out = [f"\n   Testing generation: '{query}'"]
     try:
-        bedrock_agent_runtime = boto3.client('bedrock-agent-runtime', region_name='us-west-2')
-        
-        response = bedrock_agent_runtime.retrieve_and_generate(
+        response = _BEDROCK_RUNTIME.retrieve_and_generate(
             input={
                 'text': query
             },
@@ -90,31 +104,34 @@ def test_generate_with_kb(kb_id, query):
             }
         )
         
-        print(f"✅ Generated response for: '{query}'")
-        print(f"   Response: {response['output']['text'][:200]}...")
+        out.append(f"✅ Generated response for: '{query}'")
+        out.append(f"   Response: {response['output']['text']:.200}...")
         
         # Show citations
         if 'citations' in response:
-            print(f"   Citations: {len(response['citations'])}")
+            out.append(f"   Citations: {len(response['citations'])}")
             for i, citation in enumerate(response['citations'], 1):
                 if 'retrievedReferences' in citation:
                     for ref in citation['retrievedReferences']:
                         if 'location' in ref:
                             location = ref['location']
                             if 's3Location' in location:
-                                print(f"     Citation {i}: {location['s3Location'].get('uri', 'Unknown')}")
+                                out.append(f"     Citation {i}: {location['s3Location'].get('uri', 'Unknown')}")
         
         return True
         
     except ClientError as e:
-        print(f"❌ Generation error: {e}")
+        out.append(f"❌ Generation error: {e}")
         return False
+    
+    finally:
+        sys.stdout.write("\n".join(out) + "\n")
 
 def main():
     kb_id = "CXQC5BHAMH"  # Your Knowledge Base ID
     
     print("🧠 Knowledge Base Diagnostic Test")
-    print("=" * 50)
+    print(BAR50)
     
     # Test 1: Knowledge Base status
     print("\n1. Testing Knowledge Base Status...")
@@ -131,11 +148,10 @@ def main():
             "MC750 crane maximum capacity"
         ]
         
-        retrieval_success = 0
-        for query in test_queries:
-            print(f"\n   Testing query: '{query}'")
-            if test_bedrock_retrieval(kb_id, query):
-                retrieval_success += 1
+        # Queries are independent round-trips, so overlap them on the shared client
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(test_bedrock_retrieval, kb_id, q) for q in test_queries]
+            retrieval_success = sum(1 for f in futures if f.result())
         
         print(f"\n   Retrieval Success Rate: {retrieval_success}/{len(test_queries)}")
         
@@ -146,11 +162,12 @@ def main():
             "What is the operating weight of the X950 excavator?"
         ]
         
-        for query in generation_queries:
-            print(f"\n   Testing generation: '{query}'")
-            test_generate_with_kb(kb_id, query)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(test_generate_with_kb, kb_id, q) for q in generation_queries]
+            for future in futures:
+                future.result()
     
-    print("\n" + "=" * 50)
+    print("\n" + BAR50)
     print("Diagnostic complete!")
 
 if __name__ == "__main__":
@@ -3,19 +3,41 @@
 Test the new Knowledge Base L3CRT5Q79H
 """
 
+import asyncio
 import boto3
 import json
 from botocore.exceptions import ClientError
+from boto_config import BOTO_CONFIG
+
+BAR50 = "=" * 50
+
+# Clients are created once at import and shared by every test
+_BEDROCK_AGENT = boto3.client('bedrock-agent', region_name='us-west-2', config=BOTO_CONFIG)
+_BEDROCK_RUNTIME = boto3.client('bedrock-agent-runtime', region_name='us-west-2', config=BOTO_CONFIG)
+
+async def _retrieve_all(kb_id, queries):
+    """Issue all retrieval queries concurrently, returning responses or errors in query order"""
+    return await asyncio.gather(
+        *[
+            asyncio.to_thread(
+                _BEDROCK_RUNTIME.retrieve,
+                knowledgeBaseId=kb_id,
+                retrievalQuery={'text': query},
+                retrievalConfiguration={'vectorSearchConfiguration': {'numberOfResults': 2}}
+            )
+            for query in queries
+        ],
+        return_exceptions=True
+    )
 
 def test_knowledge_base(kb_id):
     """Test the Knowledge Base functionality"""
     print(f'🧪 Testing Knowledge Base: {kb_id}')
-    print('=' * 50)
+    print(BAR50)
     
     try:
         # Test Knowledge Base status
-        bedrock_agent = boto3.client('bedrock-agent', region_name='us-west-2')
-        response = bedrock_agent.get_knowledge_base(knowledgeBaseId=kb_id)
+        response = _BEDROCK_AGENT.get_knowledge_base(knowledgeBaseId=kb_id)
         kb_info = response['knowledgeBase']
         
         print(f'✅ Knowledge Base Found!')
@@ -24,15 +46,16 @@ def test_knowledge_base(kb_id):
         print(f'   Description: {kb_info.get("description", "N/A")}')
         
         # Check data sources
-        data_sources = bedrock_agent.list_data_sources(knowledgeBaseId=kb_id)
-        print(f'   Data Sources: {len(data_sources["dataSourceSummaries"])}')
+        data_sources = _BEDROCK_AGENT.list_data_sources(knowledgeBaseId=kb_id)
+        summaries = data_sources["dataSourceSummaries"]
         
-        for ds in data_sources["dataSourceSummaries"]:
-            print(f'     - {ds["name"]}: {ds["status"]}')
+        # Print the count and every data source in a single call
+        print('\n'.join(
+            [f'   Data Sources: {len(summaries)}']
+            + [f'     - {ds["name"]}: {ds["status"]}' for ds in summaries]
+        ))
         
         # Test retrieval
-        bedrock_runtime = boto3.client('bedrock-agent-runtime', region_name='us-west-2')
-        
         test_queries = [
             'BD850 bulldozer engine specifications',
             'DT1000 dump truck payload capacity',
@@ -40,35 +63,32 @@ def test_knowledge_base(kb_id):
         ]
         
         print(f'\n🔍 Testing Document Retrieval:')
-        for query in test_queries:
+        responses = asyncio.run(_retrieve_all(kb_id, test_queries))
+        for query, response in zip(test_queries, responses):
             print(f'\n   Query: "{query}"')
             
-            try:
-                response = bedrock_runtime.retrieve(
-                    knowledgeBaseId=kb_id,
-                    retrievalQuery={'text': query},
-                    retrievalConfiguration={'vectorSearchConfiguration': {'numberOfResults': 2}}
-                )
-                
-                results = response['retrievalResults']
-                print(f'   ✅ Retrieved {len(results)} results')
-                
-                for i, result in enumerate(results, 1):
-                    print(f'     Result {i}: Score {result["score"]:.3f}')
-                    print(f'     Content: {result["content"]["text"][:80]}...')
-                    if 'location' in result and 's3Location' in result['location']:
-                        source = result['location']['s3Location']['uri'].split('/')[-1]
-                        print(f'     Source: {source}')
-                        
-            except ClientError as e:
-                print(f'   ❌ Retrieval error: {e}')
+            if isinstance(response, ClientError):
+                print(f'   ❌ Retrieval error: {response}')
+                continue
+            if isinstance(response, BaseException):
+                raise response
+            
+            results = response['retrievalResults']
+            print(f'   ✅ Retrieved {len(results)} results')
+            
+            for i, result in enumerate(results, 1):
+                print(f'     Result {i}: Score {result["score"]:.3f}')
+                print(f'     Content: {result["content"]["text"]:.80}...')
+                if 'location' in result and 's3Location' in result['location']:
+                    source = result['location']['s3Location']['uri'].split('/')[-1]
+                    print(f'     Source: {source}')
         
         # Test generation
         print(f'\n🤖 Testing Knowledge Base Generation:')
         test_question = "What are the engine specifications of the BD850 bulldozer?"
         
         try:
-            response = bedrock_runtime.retrieve_and_generate(
+            response = _BEDROCK_RUNTIME.retrieve_and_generate(
                 input={'text': test_question},
                 retrieveAndGenerateConfiguration={
                     'type': 'KNOWLEDGE_BASE',
@@ -80,7 +100,7 @@ def test_knowledge_base(kb_id):
             )
             
             print(f'   ✅ Generated Response:')
-            print(f'   {response["output"]["text"][:200]}...')
+            print(f'   {response["output"]["text"]:.200}...')
             
             if 'citations' in response:
                 print(f'   📚 Citations: {len(response["citations"])}')